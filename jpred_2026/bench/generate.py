@@ -0,0 +1,180 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.11"
+# dependencies = [
+#     "click",
+#     "numpy",
+#     "pandas",
+# ]
+# ///
+"""
+Synthetic data generators for the benchmark suite.
+
+generate_tsv writes a Google Form export with N participants in the same
+layout as the real form (Timestamp, Name or Nickname, Contact Email Address,
+then one column per line of cols/*.cols). Picks are realistic rather than
+uniform: each participant ranks every group by a noisy copy of the team order
+in tables/{year}/*.json, so favourites are picked far more often than outsiders,
+as in the real responses. About 5% of rows are resubmissions of an earlier
+email and about 2% reuse an earlier participant's name.
+
+generate_standings writes tables/{year}/*.json with a random but internally
+consistent table for every group, using the same clubs (read from the repo's
+tables/{year}/ before anything is written).
+
+Usage:
+    bench/generate.py N OUTPUT.tsv [--seed 2026] [--standings-dir tables]
+"""
+import json
+import click
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+# Prediction groups in form column order
+GROUPS = [
+    "j1_winner", "j1_east", "j1_west",
+    "j2_3_winner", "j2_3_east_a", "j2_3_east_b", "j2_3_west_a", "j2_3_west_b",
+]
+
+# Winner picks are drawn from these groups combined
+WINNER_GROUPS = {
+    "j1_winner":   ["j1_east", "j1_west"],
+    "j2_3_winner": ["j2_3_east_a", "j2_3_east_b", "j2_3_west_a", "j2_3_west_b"],
+}
+
+# How far a participant's ranking strays from the reference table (in places)
+PICK_NOISE = 3.0
+
+REPO = Path(__file__).resolve().parent.parent
+
+
+def load_group_columns(cols_dir):
+    """Return {group: [column, ...]} from cols/*.cols."""
+    return {
+        group: [line.strip() for line in open(Path(cols_dir) / f"{group}.cols") if line.strip()]
+        for group in GROUPS
+    }
+
+
+def load_reference_tables(year=2026):
+    """Return {group: [club, ...]} in table order for every group in the repo's tables/{year}/."""
+    tables_dir = REPO / 'tables' / str(year)
+    json_files = sorted(tables_dir.glob('*.json'))
+    if not json_files:
+        raise FileNotFoundError(f"no standings JSON in {tables_dir} to take the {year} clubs from")
+    tables = {}
+    for json_file in json_files:
+        rows = sorted(json.load(open(json_file, encoding='utf-8')), key=lambda r: r['Position'])
+        tables[json_file.stem] = [r['Club'] for r in rows]
+    return tables
+
+
+def noisy_rankings(rng, clubs, n):
+    """Return an (n, len(clubs)) array: each row is one participant's club order."""
+    strength = np.arange(len(clubs), dtype=float)
+    scores = strength + rng.normal(0, PICK_NOISE, size=(n, len(clubs)))
+    return np.argsort(scores, axis=1)
+
+
+def slot_indices(n_slots, n_teams):
+    """Table indices predicted by a group's columns: top half first, then the bottom."""
+    top = (n_slots + 1) // 2
+    return list(range(top)) + list(range(n_teams - (n_slots - top), n_teams))
+
+
+def generate_tsv(path, n, cols_dir='cols', seed=2026, year=2026):
+    """Write a synthetic form export with n rows to path."""
+    rng = np.random.default_rng(seed)
+    group_columns = load_group_columns(cols_dir)
+    tables = load_reference_tables(year)
+
+    data = {}
+    rankings = {group: noisy_rankings(rng, clubs, n) for group, clubs in tables.items()}
+    for group in GROUPS:
+        cols = group_columns[group]
+        if group in WINNER_GROUPS:
+            # The winner is the favourite of the participant's own group-winner picks
+            sources = WINNER_GROUPS[group]
+            leaders = np.stack([np.array(tables[g], dtype=object)[rankings[g][:, 0]] for g in sources], axis=1)
+            choice = rng.integers(0, len(sources), size=n)
+            data[cols[0]] = leaders[np.arange(n), choice]
+            continue
+        clubs = np.array(tables[group], dtype=object)
+        for col, idx in zip(cols, slot_indices(len(cols), len(clubs))):
+            data[col] = clubs[rankings[group][:, idx]]
+
+    ids = np.arange(n)
+    email_ids = ids.copy()
+    resubmit = rng.random(n) < 0.05
+    email_ids[resubmit] = rng.integers(0, n, size=resubmit.sum())
+    name_ids = email_ids.copy()
+    shared = rng.random(n) < 0.02
+    name_ids[shared] = rng.integers(0, n, size=shared.sum())
+
+    start = pd.Timestamp(f"{year}-01-05")
+    seconds = np.sort(rng.integers(0, 50 * 24 * 3600, size=n))
+    timestamps = (start + pd.to_timedelta(seconds, unit='s')).strftime('%d/%m/%Y %H:%M:%S')
+
+    df = pd.DataFrame({
+        'Timestamp': timestamps,
+        'Name or Nickname': [f"Player {i}" for i in name_ids],
+        'Contact Email Address (Not Published)': [f"player{i}@example.com" for i in email_ids],
+    })
+    df = pd.concat([df, pd.DataFrame(data)], axis=1)
+    df.to_csv(path, sep='\t', index=False)
+    return path
+
+
+def generate_standings(tables_dir, year, seed=2026, played=17):
+    """Write tables/{year}/{group}.json with a random table for every group."""
+    rng = np.random.default_rng(seed)
+    tables = load_reference_tables(year)
+    out = Path(tables_dir) / str(year)
+    out.mkdir(parents=True, exist_ok=True)
+    for group, clubs in tables.items():
+        rows = []
+        for club in clubs:
+            won, pk_won, pk_lost = (int(x) for x in rng.multinomial(played, [0.4, 0.1, 0.1, 0.4])[:3])
+            lost = played - won - pk_won - pk_lost
+            goals_for = int(rng.integers(won, 3 * won + pk_won + pk_lost + 2))
+            goals_against = int(rng.integers(lost, 3 * lost + pk_won + pk_lost + 2))
+            rows.append({
+                "Club":            club,
+                "Points":          3 * won + 2 * pk_won + pk_lost,
+                "Played":          played,
+                "Won":             won,
+                "PK Won":          pk_won,
+                "PK Lost":         pk_lost,
+                "Lost":            lost,
+                "Goals For":       goals_for,
+                "Goals Against":   goals_against,
+                "Goal Difference": goals_for - goals_against,
+                "Form":            "".join(rng.choice(list("WDL"), size=5)),
+            })
+        rows.sort(key=lambda r: (-r["Points"], -r["Goal Difference"], -r["Goals For"]))
+        for position, row in enumerate(rows, 1):
+            row["Position"] = position
+        rows = [{"Position": r.pop("Position"), **r} for r in rows]
+        with open(out / f"{group}.json", 'w') as f:
+            json.dump(rows, f, indent=2, ensure_ascii=False)
+    return out
+
+
+@click.command()
+@click.argument('n', type=int)
+@click.argument('output', type=click.Path(dir_okay=False))
+@click.option('--seed', default=2026, show_default=True, help='Random seed.')
+@click.option('--year', default=2026, show_default=True, help='Season year for timestamps and tables.')
+@click.option('--cols-dir', default=str(REPO / 'cols'), help='Directory of *.cols files.')
+@click.option('--standings-dir', default=None, help='Also write random standings JSON under this directory.')
+def main(n, output, seed, year, cols_dir, standings_dir):
+    """Write a synthetic form export with N participants to OUTPUT."""
+    generate_tsv(output, n, cols_dir, seed, year)
+    print(f"Wrote {n} rows to {output}")
+    if standings_dir:
+        print(f"Wrote standings to {generate_standings(standings_dir, year, seed)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,282 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.11"
+# dependencies = [
+#     "click",
+#     "jinja2",
+#     "numpy",
+#     "pandas",
+#     "pillow",
+# ]
+# ///
+"""
+Benchmark the build pipeline at increasing numbers of entrants.
+
+For every size the suite generates a synthetic form export and standings
+(bench/generate.py) in a scratch directory holding copies of cols/, labels/
+and templates/, then times each stage in-process:
+
+  import   import.csv_to_sqlite          TSV -> jpred (+ normalized tables)
+  tables   json_to_db.json_to_db         tables/{year}/*.json -> {group}_{year}
+  groups   jpred.build_all_group_pages   docs/{group}.html
+  teams    jpred_teams.build_teams_page  docs/teams.html
+  users    jpred_users.build_user_pages  docs/preds/*.html, users.html, index.html
+  image    build.build_leaderboard_image docs/leaderboard*.png
+
+Every page is written (no build manifest), so the numbers are for a full
+rebuild. Stage output is discarded. Each stage runs in a fresh process, so its
+peak RSS is that stage's own (plus the interpreter and imports), not the
+high-water mark of everything before it; with --jobs the largest worker's peak
+is reported separately. Wall time, CPU time and peak RSS of every stage are
+written to a JSON file named after the current commit, so results can be
+compared across commits with --compare.
+
+Usage:
+    bench/run_bench.py [--sizes 1000,10000] [--stages import,users] [--jobs N]
+                       [--output results.json] [--compare old.json] [--keep]
+"""
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import click
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO = BENCH_DIR.parent
+sys.path.insert(0, str(REPO))
+sys.path.insert(0, str(BENCH_DIR))
+
+import generate  # noqa: E402
+
+YEAR = '2026'
+STAGES = ['import', 'tables', 'groups', 'teams', 'users', 'image']
+DEFAULT_SIZES = '1000,10000,100000,1000000'
+
+# The leaderboard image is written in fixed-size pages, so memory is bounded;
+# above this many rows the stage only adds run time.
+MAX_IMAGE_ROWS = 100000
+
+
+def git_commit():
+    """Return (short commit hash, dirty flag) of the repository, or ('unknown', False)."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=REPO,
+                                    capture_output=True, text=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown', False
+
+
+def peak_rss_mb(who=resource.RUSAGE_SELF):
+    """Peak resident set size of this process (or its largest waited-for child) so far, in MB."""
+    rss = resource.getrusage(who).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def prepare_workdir(workdir):
+    """Copy the config and templates the pipeline reads into workdir."""
+    for name in ('cols', 'labels', 'templates'):
+        shutil.copytree(REPO / name, workdir / name)
+    (workdir / 'docs' / 'preds').mkdir(parents=True)
+
+
+class Pipeline:
+    """The pipeline stages, imported once the working directory is set up.
+
+    jpred_users reads cols/ and labels/ at import time, so the modules are
+    imported after chdir into the scratch directory.
+    """
+
+    def __init__(self, jobs):
+        import importlib
+        import build
+        import jpred
+        import jpred_teams
+        import jpred_users
+        import json_to_db
+        from rendering import get_environment
+
+        self.build = build
+        self.jpred = jpred
+        self.jpred_teams = jpred_teams
+        self.jpred_users = jpred_users
+        self.json_to_db = json_to_db
+        self.importer = importlib.import_module('import')
+        self.jobs = jobs
+        self.env = get_environment()
+        self.db_path = f'jpred_{YEAR}.db'
+        self.conn = None
+
+    def connect(self):
+        if self.conn is None:
+            self.conn = self.jpred_users.create_connection(self.db_path)
+        return self.conn
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def run(self, stage, n):
+        """Run one stage. Returns a reason string if the stage was skipped."""
+        labels = self.jpred_users.column_labels
+        league_predictions = self.jpred_users.league_predictions
+        groups = self.build.GROUPS
+
+        if stage == 'import':
+            self.close()
+            self.importer.csv_to_sqlite(f'bench_{YEAR}.tsv', self.db_path, 'jpred')
+        elif stage == 'tables':
+            self.close()
+            for league in self.json_to_db.NEW_FORMAT_LEAGUES:
+                json_file = Path('tables') / YEAR / f'{league}.json'
+                self.json_to_db.json_to_db(json_file, self.db_path, f'{league}_{YEAR}')
+        elif stage == 'groups':
+            group_columns = {group: league_predictions[group] for group in groups}
+            self.jpred.build_all_group_pages(self.connect(), self.env, group_columns, labels, YEAR)
+        elif stage == 'teams':
+            group_columns = {group: league_predictions[group] for group in groups}
+            self.jpred_teams.build_teams_page(self.connect(), self.env, group_columns, labels, YEAR)
+        elif stage == 'users':
+            self.jpred_users.build_user_pages(self.connect(), self.env, YEAR, None, self.jobs)
+        elif stage == 'image':
+            if n > MAX_IMAGE_ROWS:
+                return f'more than {MAX_IMAGE_ROWS} rows'
+            self.build.build_leaderboard_image(self.connect(), YEAR, self.jobs)
+        return None
+
+
+def _stage_process(stage, n, jobs, results):
+    """Process body for time_stage: run one stage and send back its measurements."""
+    pipeline = Pipeline(jobs)
+    wall, cpu = time.perf_counter(), time.process_time()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        # Also silences the stage's own worker processes
+        os.dup2(devnull.fileno(), 1)
+        skipped = pipeline.run(stage, n)
+    result = {
+        'entrants': n,
+        'stage':    stage,
+        'wall_s':   round(time.perf_counter() - wall, 4),
+        'cpu_s':    round(time.process_time() - cpu, 4),
+        'peak_rss_mb': peak_rss_mb(),
+    }
+    pipeline.close()
+    workers = peak_rss_mb(resource.RUSAGE_CHILDREN)
+    if workers:
+        result['worker_peak_rss_mb'] = workers
+    if skipped:
+        result = {'entrants': n, 'stage': stage, 'skipped': skipped}
+    results.send(result)
+
+
+def time_stage(stage, n, jobs):
+    """Run and time one stage in a fresh process, with its output discarded."""
+    context = multiprocessing.get_context('spawn')
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_stage_process, args=(stage, n, jobs, sender))
+    process.start()
+    sender.close()
+    try:
+        result = receiver.recv()
+    except EOFError:
+        result = None
+    process.join()
+    if result is None:
+        raise click.ClickException(f"stage {stage} failed at {n} entrants (exit code {process.exitcode})")
+    return result
+
+
+def print_comparison(results, baseline_file):
+    """Print wall-time ratios against an earlier results file."""
+    baseline = json.loads(Path(baseline_file).read_text())
+    before = {(r['entrants'], r['stage']): r['wall_s'] for r in baseline['results'] if 'wall_s' in r}
+    print(f"\nCompared with {baseline['commit']} ({baseline_file}):")
+    for r in results:
+        key = (r['entrants'], r['stage'])
+        if 'wall_s' in r and before.get(key):
+            print(f"  {r['entrants']:>9} {r['stage']:<8} {before[key]:>9.3f}s -> {r['wall_s']:>9.3f}s"
+                  f"  ({r['wall_s'] / before[key]:.2f}x)")
+
+
+@click.command()
+@click.option('--sizes', default=DEFAULT_SIZES, show_default=True, help='Comma-separated entrant counts.')
+@click.option('--stages', default=','.join(STAGES), show_default=True, help='Comma-separated stages to time.')
+@click.option('--jobs', '-j', default=1, show_default=True, help='Worker processes for the users and image stages.')
+@click.option('--seed', default=2026, show_default=True, help='Random seed for the generators.')
+@click.option('--output', default=None, help='Results file (default: bench/results/{commit}.json).')
+@click.option('--compare', 'baseline', default=None, type=click.Path(exists=True),
+              help='Earlier results file to compare wall times against.')
+@click.option('--keep', is_flag=True, help='Keep the scratch directory and print its path.')
+def main(sizes, stages, jobs, seed, output, baseline, keep):
+    """Time every pipeline stage on synthetic data at increasing sizes."""
+    sizes = [int(s) for s in sizes.split(',') if s]
+    stages = [s for s in stages.split(',') if s]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        raise click.BadParameter(f"unknown stage(s): {', '.join(sorted(unknown))}", param_hint='--stages')
+
+    commit, dirty = git_commit()
+    output = Path(output) if output else BENCH_DIR / 'results' / f'{commit}{"-dirty" if dirty else ""}.json'
+    cwd = Path.cwd()
+    workdir = Path(tempfile.mkdtemp(prefix='jpred_bench_'))
+    prepare_workdir(workdir)
+    os.chdir(workdir)
+
+    results = []
+    db_path = f'jpred_{YEAR}.db'
+    try:
+        for n in sizes:
+            print(f"\n{n} entrants: generating data...")
+            generate.generate_tsv(f'bench_{YEAR}.tsv', n, 'cols', seed, int(YEAR))
+            generate.generate_standings('tables', YEAR, seed)
+            for stage in stages:
+                result = time_stage(stage, n, jobs)
+                results.append(result)
+                if 'skipped' in result:
+                    print(f"  {stage:<8} skipped ({result['skipped']})")
+                else:
+                    workers = result.get('worker_peak_rss_mb')
+                    print(f"  {stage:<8} {result['wall_s']:>9.3f}s wall {result['cpu_s']:>9.3f}s cpu"
+                          f" {result['peak_rss_mb']:>8.1f} MB" + (f" ({workers:.1f} MB/worker)" if workers else ''))
+            # Start the next size from an empty database and docs/
+            Path(db_path).unlink(missing_ok=True)
+            shutil.rmtree('docs')
+            (workdir / 'docs' / 'preds').mkdir(parents=True)
+    finally:
+        os.chdir(cwd)
+        if keep:
+            print(f"\nScratch directory kept: {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        'commit':    commit,
+        'dirty':     dirty,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python':    platform.python_version(),
+        'platform':  platform.platform(),
+        'jobs':      jobs,
+        'seed':      seed,
+        'results':   results,
+    }, indent=2))
+    print(f"\nResults written to {output}")
+
+    if baseline:
+        print_comparison(results, baseline)
+
+
+if __name__ == '__main__':
+    main()
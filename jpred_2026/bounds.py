@@ -0,0 +1,263 @@
+"""
+Bounds on the final scores, and elimination from first place.
+
+For every participant the solver finds the highest and lowest total under
+GROUP_SCORING over a relaxation of the ways the remaining games can go:
+
+  - each club can still finish on any points total from its current Points to
+    Points + 3 x its remaining games (tables/{year}/{group}.json, see
+    scoring.load_records); the standings have no fixture list, so clubs'
+    results are treated as independent
+  - clubs level on points may finish in either order (goal difference can
+    still change), until the group has no games left, when the current table
+    is final
+  - a group with a standings table in the database but no standings JSON
+    (not scraped yet) is left open: its clubs may finish in any order
+
+The relaxation covers every table that can really happen (two clubs cannot both
+win the game between them, but that is allowed here), so the true best and
+worst totals lie within the bounds, which may themselves be unreachable. For
+the same reason elimination is conservative: it is never reported for someone
+who can still finish first, but may be missed for someone who cannot.
+
+Groups are independent, so a participant's best total is the sum of their
+best per-group scores (likewise the worst). Within a group, a final table is
+reachable if the clubs can be placed top to bottom with non-increasing points,
+which only depends on which clubs are already placed. The solver is a dynamic
+program over those sets (2^10 for a group of 10) instead of enumerating
+results or orders. It is pruned by each club's possible positions, which come
+from comparing points intervals, and a group with no uncertainty skips it.
+Participants with the same picks in a group share one column of the program.
+
+Scores are compared as leaderboard keys (points, then exact matches, then J1
+exact matches). A participant is eliminated when someone is ahead of them in
+every outcome. That holds when another participant's worst key beats their
+best, or when maximizing the difference between the two, group by group, still
+leaves them behind; the second check is run against the participants with the
+best worst cases.
+
+Results are cached in score_bounds, keyed by a hash of the points intervals
+and every participant's picks, so a rebuild with unchanged standings and
+picks reads them back instead of solving again.
+"""
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+
+import instrument
+from scoring import GROUP_SCORING, J1_GROUPS, load_picks, load_records, load_standings
+
+# Leaderboard key per pick, as in simulate.py: points, exact matches, J1 exact matches
+POINTS_WEIGHT, EXACT_WEIGHT, J1_EXACT_WEIGHT = 10000, 100, 1
+
+# Participants with the best worst cases checked pairwise for elimination
+ELIMINATION_RIVALS = 3
+
+
+def point_intervals(conn, year):
+    """Return {group: (teams, low, high)}: each club's lowest and highest final points.
+
+    teams are TeamIds (None for a club not in the registry). For a group whose
+    final table is settled, low == high and the values are distinct and in
+    table order. A group with no standings JSON gets the same wide interval
+    for every club, so any order is possible.
+    """
+    intervals = {}
+    records = load_records(year)
+    for group in load_standings(conn, year):
+        if group not in GROUP_SCORING:
+            continue
+        df = records.get(group)
+        if df is None:
+            # No records to bound the points by: every club can finish anywhere
+            teams = [team for (team,) in conn.execute(
+                f'SELECT TeamId FROM "{GROUP_SCORING[group]["table"]}_{year}" ORDER BY Position')]
+            low = np.zeros(len(teams), dtype=np.int64)
+            intervals[group] = (teams, low, low + 3 * 2 * (len(teams) - 1))
+            continue
+        if not df['Remaining'].any():
+            # Settled: the current order is final
+            points = np.arange(len(df), 0, -1)
+            intervals[group] = (list(df['TeamId']), points, points)
+            continue
+        points = df['Points'].to_numpy(dtype=np.int64)
+        intervals[group] = (list(df['TeamId']), points, points + 3 * df['Remaining'].to_numpy(dtype=np.int64))
+    return intervals
+
+
+def position_ranges(low, high):
+    """Return (best, worst): the highest and lowest position each club can still reach."""
+    best = 1 + (low[None, :] > high[:, None]).sum(axis=1)
+    worst = len(low) - (high[None, :] < low[:, None]).sum(axis=1)
+    return best, worst
+
+
+def pick_gains(group, patterns, teams):
+    """Return gains[u, k, t]: the key pattern u earns if club t finishes in position k + 1."""
+    scoring = GROUP_SCORING[group]
+    count = len(teams)
+    gains = np.zeros((len(patterns), count, count), dtype=np.int64)
+    position = np.arange(1, count + 1)
+    j1 = group in J1_GROUPS
+    for slot, (expected, (low, high)) in enumerate(zip(scoring['positions'], scoring['zones'])):
+        exact = position == expected
+        key = (2 * exact + ((position >= low) & (position <= high))) * POINTS_WEIGHT
+        key = key + exact * (EXACT_WEIGHT + J1_EXACT_WEIGHT * j1)
+        picked = patterns[:, slot]
+        rows = np.flatnonzero(picked >= 0)
+        gains[rows, :, picked[rows]] += key
+    return gains
+
+
+def solve_group(gains, low, high, rival=None):
+    """Return (best, worst) key per pattern over every reachable final table.
+
+    With rival (a gains row for one participant), best is instead the largest
+    achievable key difference pattern - rival; worst is not computed.
+    """
+    count = low.shape[0]
+    best_pos, worst_pos = position_ranges(low, high)
+    if rival is not None:
+        gains = gains - rival[None, :, :]
+
+    # Settled: every club has exactly one possible position
+    if (best_pos == worst_pos).all():
+        score = gains[:, best_pos - 1, np.arange(count)].sum(axis=1)
+        return score, score
+
+    full = 1 << count
+    best = [None] * full
+    worst = [None] * full
+    best[0] = np.zeros(gains.shape[0], dtype=np.int64)
+    worst[0] = best[0]
+    cap = np.full(full, np.iinfo(np.int64).max)
+    for placed in range(full):
+        if best[placed] is None:
+            continue
+        position = bin(placed).count('1')  # 0-based position of the next club
+        for t in range(count):
+            bit = 1 << t
+            # Club t fits next if its position range allows it and it can
+            # finish on no more points than every club above it
+            if placed & bit or low[t] > cap[placed] or not best_pos[t] - 1 <= position <= worst_pos[t] - 1:
+                continue
+            after = placed | bit
+            gain = gains[:, position, t]
+            if best[after] is None:
+                best[after] = best[placed] + gain
+                if rival is None:
+                    worst[after] = worst[placed] + gain
+                cap[after] = min(cap[placed], high[t])
+            else:
+                np.maximum(best[after], best[placed] + gain, out=best[after])
+                if rival is None:
+                    np.minimum(worst[after], worst[placed] + gain, out=worst[after])
+    if best[full - 1] is None:
+        # The intervals admit no final table: bound each position on its own instead
+        return gains.max(axis=2).sum(axis=1), gains.min(axis=2).sum(axis=1)
+    return best[full - 1], worst[full - 1]
+
+
+def group_patterns(picks, cols, teams):
+    """Return (patterns, inverse): distinct pick rows as club indexes (-1 if none) and each participant's row.
+
+    picks holds TeamIds (load_picks) and teams the group's TeamIds (None for an unknown club).
+    """
+    index = {team: i for i, team in enumerate(teams) if team is not None}
+    encoded = np.full((len(picks), len(cols)), -1, dtype=np.int64)
+    for slot, col in enumerate(cols):
+        if col in picks:
+            encoded[:, slot] = picks[col].map(index).fillna(-1).astype(np.int64).to_numpy()
+    patterns, inverse = np.unique(encoded, axis=0, return_inverse=True)
+    return patterns, inverse.reshape(-1)
+
+
+def solve_bounds(intervals, picks, league_predictions):
+    """Return a DataFrame indexed by Name: min_points, max_points, eliminated."""
+    groups = []
+    best_key = np.zeros(len(picks), dtype=np.int64)
+    worst_key = np.zeros(len(picks), dtype=np.int64)
+    for group, (teams, low, high) in intervals.items():
+        cols = league_predictions.get(group, [])[:len(GROUP_SCORING[group]['positions'])]
+        if not cols:
+            continue
+        patterns, inverse = group_patterns(picks, cols, teams)
+        gains = pick_gains(group, patterns, teams)
+        best, worst = solve_group(gains, low, high)
+        best_key += best[inverse]
+        worst_key += worst[inverse]
+        groups.append((gains, inverse, low, high))
+
+    # Eliminated if a rival's worst case beats their best case...
+    eliminated = best_key < worst_key.max(initial=0)
+    # ...or a rival finishes ahead in every outcome, group by group
+    for rival in np.argsort(-worst_key, kind='stable')[:ELIMINATION_RIVALS]:
+        open_ = ~eliminated
+        open_[rival] = False
+        if not open_.any():
+            break
+        margin = np.zeros(len(picks), dtype=np.int64)
+        for gains, inverse, low, high in groups:
+            difference, _ = solve_group(gains, low, high, rival=gains[inverse[rival]])
+            margin += difference[inverse]
+        eliminated |= open_ & (margin < 0)
+
+    return pd.DataFrame({
+        'min_points': worst_key // POINTS_WEIGHT,
+        'max_points': best_key // POINTS_WEIGHT,
+        'eliminated': eliminated,
+    }, index=picks.index)
+
+
+def bounds_hash(intervals, picks):
+    """Return a stable hash of the points intervals and every participant's picks."""
+    payload = json.dumps(
+        {group: [teams, low.tolist(), high.tolist()] for group, (teams, low, high) in intervals.items()},
+        sort_keys=True, ensure_ascii=False)
+    digest = hashlib.sha256(payload.encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(picks.reset_index(), index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+@instrument.stage('bounds')
+def score_bounds(conn, year, league_predictions, picks=None):
+    """Return bounds for every participant (see solve_bounds), cached in score_bounds.
+
+    picks is load_picks output, if already loaded. Returns an empty DataFrame
+    when no standings are loaded.
+    """
+    if picks is None:
+        picks = load_picks(conn, league_predictions)
+    intervals = point_intervals(conn, year)
+    if not intervals:
+        return pd.DataFrame(columns=['min_points', 'max_points', 'eliminated'])
+    key = bounds_hash(intervals, picks)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS score_bounds (
+            bounds_hash TEXT    NOT NULL,
+            user        TEXT    NOT NULL,
+            min_points  INTEGER NOT NULL,
+            max_points  INTEGER NOT NULL,
+            eliminated  INTEGER NOT NULL,
+            PRIMARY KEY (bounds_hash, user)
+        )
+    """)
+    cached = conn.execute('SELECT user, min_points, max_points, eliminated FROM score_bounds '
+                          'WHERE bounds_hash = ?', (key,)).fetchall()
+    if cached:
+        bounds = pd.DataFrame.from_records(cached, columns=['Name', 'min_points', 'max_points', 'eliminated'],
+                                           index='Name')
+        bounds['eliminated'] = bounds['eliminated'].astype(bool)
+        return bounds
+
+    bounds = solve_bounds(intervals, picks, league_predictions)
+    with conn:
+        # Only the latest result is kept
+        conn.execute('DELETE FROM score_bounds')
+        conn.executemany('INSERT INTO score_bounds VALUES (?, ?, ?, ?, ?)',
+                         ((key, name, int(row.min_points), int(row.max_points), int(row.eliminated))
+                          for name, row in bounds.iterrows()))
+    return bounds
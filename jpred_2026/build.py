@@ -0,0 +1,217 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.11"
+# dependencies = [
+#     "click",
+#     "jinja2",
+#     "pandas",
+#     "pillow",
+# ]
+# ///
+"""
+Build the whole JPred site in a single process.
+
+Runs the same steps as build_preds.sh / make_all.sh, but as stages of one
+Python process: the config (cols/ and labels/) and the database connection are
+loaded once and every page generator shares one Jinja Environment (rendering.py), so pandas
+and jinja2 are only imported once per rebuild.
+
+Stages:
+  1. import.py                     *{year}*.tsv -> jpred table   (skip with --no-import)
+  2. json_to_db.py                 tables/{year}/*.json -> {group}_{year} tables
+  3. jpred.py                      docs/{group}.html for every group (one aggregate scan)
+  4. jpred_teams.py                docs/teams.html
+  5. jpred_users.py                docs/preds/*.html, docs/users.html, docs/index.html
+  6. generate_leaderboard_image.py docs/leaderboard*.png      (only with --image; .svg with
+                                  --image-format svg)
+
+Pages are rebuilt incrementally: a page whose inputs are unchanged since the
+last build is left untouched (see manifest.py). Use --full to rewrite them all.
+
+The build ends with a per-stage summary of wall/CPU time, SQL statements, pages
+rendered and bytes written (see instrument.py). --profile also writes cProfile
+stats and a Chrome trace to profile/.
+
+Usage:
+    build.py [--year YEAR] [--no-import] [--image [--image-format svg]] [--full] [--jobs N] [--profile]
+"""
+import filecmp
+import importlib
+import shutil
+import click
+from pathlib import Path
+
+import json_to_db
+import jpred
+import jpred_teams
+import jpred_users
+import generate_leaderboard_image
+import instrument
+from manifest import BuildManifest
+from rendering import get_environment
+from scoring import load_leaderboard
+
+# import.py cannot be imported with an import statement ("import" is a keyword)
+importer = importlib.import_module('import')
+
+# Group pages in display order
+GROUPS = jpred_teams.GROUPS
+
+
+def detect_year():
+    """Return the latest year directory under tables/, or None."""
+    tables_dir = Path('tables')
+    if not tables_dir.exists():
+        return None
+    year_dirs = [d for d in tables_dir.iterdir() if d.is_dir() and d.name.isdigit()]
+    return max(d.name for d in year_dirs) if year_dirs else None
+
+
+def import_predictions(year, db_path, chunksize=None, incremental=False):
+    """Stage 1: import the Google Form TSV export into the jpred table.
+
+    With chunksize the export is streamed with bounded memory; with incremental
+    only submissions added or edited since the last import are applied (see
+    import.py).
+    """
+    tsv_glob = list(Path('.').glob(f'*{year}*.tsv'))
+    if not tsv_glob:
+        print(f"Error: No TSV file matching *{year}*.tsv found in current directory.")
+        raise SystemExit(1)
+    importer.csv_to_sqlite(tsv_glob[0], db_path, 'jpred', chunksize, incremental)
+
+
+@instrument.stage('standings')
+def import_standings(year, db_path):
+    """Stage 2: import tables/{year}/*.json into the {group}_{year} tables."""
+    year_path = Path('tables') / year
+    if not year_path.is_dir():
+        print(f"Skipped (tables/{year}/ not found - scores will show as '-')")
+        return
+    for league in json_to_db.NEW_FORMAT_LEAGUES:
+        json_file = year_path / f"{league}.json"
+        if not json_file.exists():
+            print(f"Skipping {json_file} (not found)")
+            continue
+        json_to_db.json_to_db(json_file, db_path, f"{league}_{year}")
+
+
+def build_leaderboard_image(conn, year, jobs=1, image_format='png', manifest=None):
+    """Stage 6: render docs/leaderboard*.png (or docs/leaderboard.svg) from the latest score snapshot.
+
+    With a manifest only images whose rows changed are rewritten.
+    """
+    leaderboard = load_leaderboard(conn)
+    if not leaderboard:
+        print("Skipped leaderboard image (no score snapshot yet)")
+        return
+    if image_format == 'svg':
+        generate_leaderboard_image.create_leaderboard_svg(leaderboard, 'docs/leaderboard.svg', year, manifest)
+    else:
+        generate_leaderboard_image.create_leaderboard_image(leaderboard, 'docs/leaderboard.png', year, jobs,
+                                                            manifest=manifest)
+
+
+def copy_asset(src, dst):
+    """Copy src to dst with its mtime, unless dst already has the same content.
+
+    Unchanged assets keep their mtime, so the rsync deploy skips them.
+    """
+    dst = Path(dst)
+    if dst.exists() and filecmp.cmp(src, dst, shallow=False):
+        return
+    shutil.copy2(src, dst)
+
+
+@instrument.stage('assets')
+def copy_assets():
+    """Copy the stylesheet, search script and favicons into docs/."""
+    copy_asset('style.css', 'docs/style.css')
+    copy_asset('search.js', 'docs/search.js')
+    favicons = Path('assets/favicons')
+    if favicons.is_dir():
+        for f in favicons.iterdir():
+            if f.suffix in ('.png', '.ico', '.webmanifest'):
+                copy_asset(f, Path('docs') / f.name)
+
+
+def build_pages(year, db_path, full=False, jobs=1, image=False, image_format='png'):
+    """Stages 3-6: generate every page from the database and copy the assets.
+
+    Also used by watch.py to rebuild in-process when the standings change.
+    """
+    Path('docs/preds').mkdir(parents=True, exist_ok=True)
+
+    # Config loaded once by jpred_users at import time, shared with every stage
+    column_labels = jpred_users.column_labels
+    league_predictions = jpred_users.league_predictions
+
+    env = get_environment()
+
+    manifest = BuildManifest(full=full)
+    conn = jpred_users.create_connection(db_path)
+    if conn is None:
+        print('Error! Cannot connect to the database.')
+        raise SystemExit(1)
+
+    # One read of predictions for the group counts and the team report
+    group_columns = {group: league_predictions[group] for group in GROUPS}
+    with instrument.stage('team index'):
+        index = jpred_teams.team_index(conn, group_columns)
+
+    print("\nStep 3: Generate aggregate prediction summary pages...")
+    jpred.build_all_group_pages(conn, env, group_columns, column_labels, year, manifest, index)
+
+    print("\nStep 4: Generate team A-Z report...")
+    jpred_teams.build_teams_page(conn, env, group_columns, column_labels, year, manifest, index)
+
+    print("\nStep 5: Generate per-user prediction pages...")
+    jpred_users.build_user_pages(conn, env, year, manifest, jobs)
+
+    if image:
+        print("\nStep 6: Generate leaderboard image...")
+        build_leaderboard_image(conn, year, jobs, image_format, manifest)
+    manifest.save()
+    conn.close()
+
+    copy_assets()
+
+
+@click.command()
+@click.option('--year', default=None, help='Season year (e.g. 2026). Auto-detects latest from tables/ if omitted.')
+@click.option('--import/--no-import', 'do_import', default=True,
+              help='Re-import the TSV and standings JSON before building (default: on).')
+@click.option('--image/--no-image', default=False, help='Also render docs/leaderboard*.png.')
+@click.option('--image-format', type=click.Choice(['png', 'svg']), default='png', show_default=True,
+              help='Leaderboard image as PNG pages or a single streamed SVG.')
+@click.option('--full', is_flag=True, help='Rewrite every page, even if its inputs are unchanged.')
+@click.option('--jobs', '-j', default=1, show_default=True, help='Worker processes for rendering user pages and image pages.')
+@click.option('--chunksize', type=int, default=None,
+              help='Stream the TSV import this many rows at a time (bounded memory for huge exports).')
+@click.option('--incremental', is_flag=True,
+              help='Import only form submissions added or edited since the last import.')
+@click.option('--profile', is_flag=True, help='Write cProfile stats and a Chrome trace to profile/.')
+def main(year, do_import, image, image_format, full, jobs, chunksize, incremental, profile):
+    """Build every page of the JPred site in one process."""
+    year = year or detect_year()
+    if not year:
+        print("Error: could not detect year. Use --year.")
+        raise SystemExit(1)
+
+    print(f"Year: {year}")
+    db_path = f'jpred_{year}.db'
+    Path('docs/preds').mkdir(parents=True, exist_ok=True)
+
+    with instrument.run('build', profile):
+        if do_import:
+            print("\nStep 1: Import predictions from TSV into database...")
+            import_predictions(year, db_path, chunksize, incremental)
+            print("\nStep 2: Import league standings from JSON into database...")
+            import_standings(year, db_path)
+
+        build_pages(year, db_path, full=full, jobs=jobs, image=image, image_format=image_format)
+    print("\nDone. Pages written to docs/ and docs/preds/")
+
+
+if __name__ == '__main__':
+    main()
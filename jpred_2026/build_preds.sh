@@ -38,35 +38,13 @@ echo "Predictions file: $TSV"
 
 mkdir -p docs/preds
 
-echo ""
-echo "Step 1: Import predictions from TSV into database..."
-rm -f "jpred_${YEAR}.db"
-./import.py "$YEAR"
 
-echo ""
-if [ -d "tables/$YEAR" ]; then
-    echo "Step 2: Import league standings from JSON into database..."
-    ./json_to_db.py "$YEAR"
-else
-    echo "Step 2: Skipped (tables/$YEAR/ not found - scores will show as '-')"
-    echo "        Run scrape/update_tables.sh when standings are available."
-fi
-
-echo ""
-echo "Step 3: Generate aggregate prediction summary pages..."
-for GROUP in j1_winner j1_east j1_west j2_3_winner j2_3_east_a j2_3_east_b j2_3_west_a j2_3_west_b; do
-    ./jpred.py --year "$YEAR" "docs/${GROUP}.html" "cols/${GROUP}.cols"
-done
-
-echo ""
-echo "Step 4: Generate team A-Z report..."
-./jpred_teams.py --year "$YEAR"
-
-echo ""
-echo "Step 5: Generate per-user prediction pages..."
-./jpred_users.py --year "$YEAR"
-
-cp style.css docs/style.css
-
-echo ""
-echo "Done. Pages written to docs/ and docs/preds/"
+# All steps run as stages of one process (see build.py):
+#   1. import.py       TSV -> jpred table
+#   2. json_to_db.py   tables/$YEAR/*.json -> standings tables (skipped if missing)
+#   3. jpred.py        aggregate prediction summary pages
+#   4. jpred_teams.py  team A-Z report
+#   5. jpred_users.py  per-user prediction pages
+# --incremental applies only submissions added or edited since the last run
+# (falling back to a full import when it has to).
+./build.py --year "$YEAR" --incremental
@@ -15,6 +15,5 @@ else
     echo "Using specified year: $YEAR"
 fi
 
-rm -f jpred_${YEAR}.db
 ./import.py "$YEAR"
 ./json_to_db.py "$YEAR"
@@ -20,7 +20,8 @@ echo ""
 
 mkdir -p "${DEST}"
 
-rsync -av --delete "${SRC}" "${DEST}"
+# Pages are renamed into place when complete; skip any still being written
+rsync -av --delete --exclude '.*.tmp' "${SRC}" "${DEST}"
 
 echo ""
 echo "Deployed to ${DEST}"
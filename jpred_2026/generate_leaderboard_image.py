@@ -7,141 +7,346 @@
 #     "pandas",
 # ]
 # ///
+"""
+Render the leaderboard as PNG images, or as one SVG with --format svg.
 
+The leaderboard is split into pages of IMAGE_PAGE_ROWS rows, one image each:
+docs/leaderboard.png, docs/leaderboard-2.png, ... Only one page is held in
+memory per process, however large the field, and with --jobs N the pages are
+drawn by N worker processes. Images from an earlier, larger field are removed.
+With a build manifest (build.py) a page is only drawn and saved when its rows,
+the page count, the font or this module changed, so an unchanged leaderboard
+leaves every image untouched and rsync skips them.
+
+Text is drawn from cached strips: each distinct string (scores, headers) is
+rasterized once per process and pasted as a mask after that, and numbers are
+assembled from per-digit strips, so a rank costs a few pastes instead of a
+font rasterization.
+
+The font is resolved once: the first .ttf/.otf/.ttc in assets/fonts/ (put a
+CJK-capable font there for Japanese names), else the font bundled with Pillow,
+so the image looks the same on every machine.
+
+The SVG (docs/leaderboard.svg) has the same columns and colors but is written
+row by row straight to disk, one <text> element per row: nothing is
+rasterized, so a million rows take a few seconds (about 15 MB gzipped), and it
+stays sharp at any zoom. The alternating row shading and row rules are a single
+repeating <pattern> rather than an element per row.
+"""
 import click
+import hashlib
 import sqlite3
+from xml.sax.saxutils import escape
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
+import PIL
 from PIL import Image, ImageDraw, ImageFont
-import pandas as pd
+from scoring import load_leaderboard
+from manifest import WRITE_BUFFER, atomic_output, digest
+import instrument
+
+# Rows per image (docs/leaderboard.png, docs/leaderboard-2.png, ...)
+IMAGE_PAGE_ROWS = 500
+
+FONT_DIR = Path('assets/fonts')
+
+# Table settings
+ROW_HEIGHT = 30
+HEADER_HEIGHT = 60
+COL_WIDTHS = [60, 400, 80, 80, 60, 60]  # Rank, Name, Points, Exact, J1, J2/3
+HEADERS = ['Rank', 'Name', 'Points', 'Exact', 'J1', 'J2/3']
+TOTAL_WIDTH = sum(COL_WIDTHS)
+TITLE_SIZE, HEADER_SIZE, CELL_SIZE = 16, 14, 12
+
+# Colors
+BG_COLOR = (255, 255, 255)
+HEADER_COLOR = (41, 128, 185)
+TEXT_COLOR = (0, 0, 0)
+HEADER_TEXT_COLOR = (255, 255, 255)
+ALT_ROW_COLOR = (236, 240, 241)
+BORDER_COLOR = (189, 195, 199)
+
+
+# SVG text baselines, matching where the PNG puts the top of the text
+TITLE_BASELINE, HEADER_BASELINE, CELL_BASELINE = 20, 44, 20
+SVG_FONT = 'Helvetica, Arial, sans-serif'
+
 
 def get_leaderboard_data(db_path):
-    """Get leaderboard data from results table."""
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-
-    # Read from results table
-    cursor.execute("""
-        SELECT rank, name, points, exact_matches, j1_score, j2_score, j3_score
-        FROM results
-        ORDER BY rank
-    """)
-
-    leaderboard = []
-    for row in cursor.fetchall():
-        rank, name, points, exact, j1, j2, j3 = row
-        leaderboard.append({
-            'name': name,
-            'points': points,
-            'exact': exact,
-            'j1': j1,
-            'j2': j2,
-            'j3': j3
-        })
+    """Get leaderboard data from the latest score_snapshots snapshot.
 
+    The snapshot is written by jpred_users.py; returns [] if there is none yet.
+    """
+    conn = instrument.trace(sqlite3.connect(db_path))
+    leaderboard = load_leaderboard(conn)
     conn.close()
     return leaderboard
 
-def create_leaderboard_image(leaderboard, output_path, year):
-    """Create a PNG image of the leaderboard table."""
-
-    # Table settings
-    row_height = 30
-    header_height = 60
-    col_widths = [60, 400, 80, 80, 60, 60, 60]  # Rank, Name, Points, Exact, J1, J2, J3
-    total_width = sum(col_widths)
-    total_height = header_height + (len(leaderboard) * row_height)
-
-    # Colors
-    bg_color = (255, 255, 255)
-    header_color = (41, 128, 185)
-    text_color = (0, 0, 0)
-    header_text_color = (255, 255, 255)
-    alt_row_color = (236, 240, 241)
-    border_color = (189, 195, 199)
-
-    # Create image
-    img = Image.new('RGB', (total_width, total_height), bg_color)
-    draw = ImageDraw.Draw(img)
 
-    # Try to load a font, fall back to default if not available
-    try:
-        title_font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 16)
-        header_font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 14)
-        cell_font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 12)
-    except:
-        title_font = ImageFont.load_default()
-        header_font = ImageFont.load_default()
-        cell_font = ImageFont.load_default()
+@lru_cache(maxsize=None)
+def font_path():
+    """Return the font file to draw with, or None for Pillow's bundled font."""
+    fonts = sorted(p for p in FONT_DIR.glob('*') if p.suffix.lower() in ('.ttf', '.otf', '.ttc'))
+    return str(fonts[0]) if fonts else None
 
-    # Draw header
-    draw.rectangle([0, 0, total_width, header_height], fill=header_color)
 
-    # Draw title
-    title = f"JPred {year} - All Entrants"
-    title_bbox = draw.textbbox((0, 0), title, font=title_font)
-    title_width = title_bbox[2] - title_bbox[0]
-    draw.text(((total_width - title_width) // 2, 5), title, fill=header_text_color, font=title_font)
+@lru_cache(maxsize=None)
+def renderer_digest():
+    """Return the digest of what every image is drawn with: this module and the font."""
+    path = font_path()
+    font = hashlib.sha256(Path(path).read_bytes()).hexdigest() if path else f'Pillow {PIL.__version__}'
+    return digest(Path(__file__).read_text(encoding='utf-8'), font)
+
+
+@lru_cache(maxsize=None)
+def get_font(size):
+    path = font_path()
+    return ImageFont.truetype(path, size) if path else ImageFont.load_default(size)
 
-    # Draw column headers
-    headers = ['Rank', 'Name', 'Points', 'Exact', 'J1', 'J2', 'J3']
+
+@lru_cache(maxsize=4096)
+def text_strip(text, size):
+    """Return (mask, left, right): text rasterized once as an 'L' mask, and its ink extent."""
+    font = get_font(size)
+    left, _, right, bottom = font.getbbox(text)
+    mask = Image.new('L', (max(right, 1), max(bottom, 1)))
+    ImageDraw.Draw(mask).text((0, 0), text, fill=255, font=font)
+    return mask, left, right
+
+
+@lru_cache(maxsize=None)
+def digit_advance(digit, size):
+    return get_font(size).getlength(digit)
+
+
+def text_width(text, size):
+    """Ink width of text as draw_text draws it, like the width of ImageDraw.textbbox."""
+    if text.isdigit():
+        advance = sum(digit_advance(digit, size) for digit in text[:-1])
+        return int(advance) + text_strip(text[-1], size)[2] - text_strip(text[0], size)[1]
+    _, left, right = text_strip(text, size)
+    return right - left
+
+
+def draw_text(img, xy, text, color, size):
+    """Paste text at xy (the top-left that ImageDraw.text would use) from cached strips."""
+    x, y = xy
+    if not text.isdigit():
+        img.paste(color, (x, y), text_strip(text, size)[0])
+        return
+    advance = 0.0
+    for digit in text:
+        img.paste(color, (x + int(advance), y), text_strip(digit, size)[0])
+        advance += digit_advance(digit, size)
+
+
+def render_page(rows, first_rank, page, pages, year):
+    """Draw one page of the leaderboard and return it as an RGB image."""
+    height = HEADER_HEIGHT + len(rows) * ROW_HEIGHT
+    img = Image.new('RGB', (TOTAL_WIDTH, height), BG_COLOR)
+    draw = ImageDraw.Draw(img)
+
+    # Header
+    draw.rectangle([0, 0, TOTAL_WIDTH, HEADER_HEIGHT], fill=HEADER_COLOR)
+    title = f"JPred {year} - All Entrants"
+    if pages > 1:
+        title += f" ({first_rank}-{first_rank + len(rows) - 1})"
+    draw_text(img, ((TOTAL_WIDTH - text_width(title, TITLE_SIZE)) // 2, 5), title,
+              HEADER_TEXT_COLOR, TITLE_SIZE)
     x = 0
-    for i, (header, width) in enumerate(zip(headers, col_widths)):
-        bbox = draw.textbbox((0, 0), header, font=header_font)
-        text_width = bbox[2] - bbox[0]
-        text_x = x + (width - text_width) // 2
-        draw.text((text_x, 30), header, fill=header_text_color, font=header_font)
+    for header, width in zip(HEADERS, COL_WIDTHS):
+        draw_text(img, (x + (width - text_width(header, HEADER_SIZE)) // 2, 30), header,
+                  HEADER_TEXT_COLOR, HEADER_SIZE)
         x += width
 
-    # Draw rows
-    y = header_height
-    for rank, entry in enumerate(leaderboard, 1):
-        # Alternate row colors
+    # Rows
+    y = HEADER_HEIGHT
+    for rank, entry in enumerate(rows, first_rank):
+        # Alternate row colors, by overall rank so pages continue the pattern
         if rank % 2 == 0:
-            draw.rectangle([0, y, total_width, y + row_height], fill=alt_row_color)
+            draw.rectangle([0, y, TOTAL_WIDTH, y + ROW_HEIGHT], fill=ALT_ROW_COLOR)
 
-        # Draw cells
         cells = [
             str(rank),
             entry['name'][:50],  # Truncate long names
             str(entry['points']),
             str(entry['exact']),
             str(entry['j1']),
-            str(entry['j2']),
-            str(entry['j3'])
+            str(entry['j2j3'])
         ]
-
         x = 0
-        for i, (cell, width) in enumerate(zip(cells, col_widths)):
-            bbox = draw.textbbox((0, 0), cell, font=cell_font)
-            text_width = bbox[2] - bbox[0]
-
+        for i, (cell, width) in enumerate(zip(cells, COL_WIDTHS)):
             # Left align name, center align others
             if i == 1:
-                text_x = x + 10
+                # Names are nearly all distinct; drawn directly rather than cached
+                draw.text((x + 10, y + 8), cell, fill=TEXT_COLOR, font=get_font(CELL_SIZE))
             else:
-                text_x = x + (width - text_width) // 2
+                draw_text(img, (x + (width - text_width(cell, CELL_SIZE)) // 2, y + 8), cell,
+                          TEXT_COLOR, CELL_SIZE)
+            x += width
 
-            draw.text((text_x, y + 8), cell, fill=text_color, font=cell_font)
+        draw.line([(0, y + ROW_HEIGHT), (TOTAL_WIDTH, y + ROW_HEIGHT)], fill=BORDER_COLOR)
+        y += ROW_HEIGHT
 
-            # Draw vertical borders
-            draw.line([(x + width, header_height), (x + width, total_height)], fill=border_color)
-            x += width
+    # Column borders, once per page
+    x = 0
+    for width in COL_WIDTHS:
+        x += width
+        draw.line([(x, HEADER_HEIGHT), (x, height)], fill=BORDER_COLOR)
+
+    # Outer border
+    draw.rectangle([0, 0, TOTAL_WIDTH - 1, height - 1], outline=BORDER_COLOR, width=2)
+    return img
+
+
+def page_path(output_path, page):
+    """Return the file for a page: output_path itself for page 1, then name-2.png, ..."""
+    output_path = Path(output_path)
+    return output_path if page == 1 else output_path.with_name(f'{output_path.stem}-{page}{output_path.suffix}')
+
+
+def write_page_image(output_path, year, pages, task):
+    """Render one page, task = (page, first_rank, rows), and save it (renamed into place).
+
+    Returns the instrument counts for the page, for --jobs workers.
+    """
+    page, first_rank, rows = task
+    before = instrument.snapshot()
+    path = page_path(output_path, page)
+    img = render_page(rows, first_rank, page, pages, year)
+    with atomic_output(path) as tmp:
+        img.save(tmp, format='PNG')
+    instrument.record_write(path)
+    return instrument.since(before)
+
+
+@instrument.stage('leaderboard image')
+def create_leaderboard_image(leaderboard, output_path, year, jobs=1, page_rows=IMAGE_PAGE_ROWS, manifest=None):
+    """Write the leaderboard as PNG pages of page_rows rows: output_path, then name-2.png, ...
+
+    jobs > 1 renders the pages in a pool of that many worker processes. With a
+    manifest, pages whose inputs are unchanged are not redrawn or rewritten.
+    """
+    pages = max(1, -(-len(leaderboard) // page_rows))
+    tasks = [(page, (page - 1) * page_rows + 1, leaderboard[(page - 1) * page_rows:page * page_rows])
+             for page in range(1, pages + 1)]
+    keys = {}
+    if manifest is not None:
+        for page, first_rank, rows in tasks:
+            keys[page] = digest(renderer_digest(), year, pages, first_rank, rows)
+        tasks = [task for task in tasks if not manifest.is_current(page_path(output_path, task[0]), keys[task[0]])]
+    if jobs > 1 and len(tasks) > 1:
+        font_path()  # resolved before the pool starts, so forked workers inherit it
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            for counts in pool.map(partial(write_page_image, output_path, year, pages), tasks):
+                instrument.add(counts)
+    else:
+        for task in tasks:
+            write_page_image(output_path, year, pages, task)
+    if manifest is not None:
+        for page, _, _ in tasks:
+            manifest.record(page_path(output_path, page), keys[page])
+
+    # Pages left over from a larger field
+    output_path = Path(output_path)
+    for f in output_path.parent.glob(f'{output_path.stem}-*{output_path.suffix}'):
+        number = f.stem[len(output_path.stem) + 1:]
+        if number.isdigit() and int(number) > pages:
+            f.unlink()
+            if manifest is not None:
+                manifest.forget(f)
+            print(f"Removed stale {f}")
+
+    print(f"Leaderboard image: wrote {len(tasks)} of {pages} page(s) ({output_path}"
+          + (f", +{pages - 1} more" if pages > 1 else "") + ")")
+
+
+def _rgb(color):
+    return '#%02x%02x%02x' % color
+
+
+def _svg_x(i):
+    """x of the text in column i: the left edge plus padding for Name, the center otherwise."""
+    left = sum(COL_WIDTHS[:i])
+    return left + 10 if i == 1 else left + COL_WIDTHS[i] // 2
+
+
+@instrument.stage('leaderboard svg')
+def create_leaderboard_svg(leaderboard, output_path, year, manifest=None):
+    """Stream the leaderboard to output_path as one SVG, a row at a time.
+
+    Same columns and colors as create_leaderboard_image; the file is renamed
+    into place once complete. With a manifest an unchanged SVG is not rewritten.
+    """
+    key = None
+    if manifest is not None:
+        key = digest(renderer_digest(), year, leaderboard)
+        if manifest.is_current(output_path, key):
+            print(f"Leaderboard SVG unchanged ({output_path})")
+            return
+    height = HEADER_HEIGHT + len(leaderboard) * ROW_HEIGHT
+    xs = [_svg_x(i) for i in range(len(COL_WIDTHS))]
+    borders = []
+    x = 0
+    for width in COL_WIDTHS:
+        x += width
+        borders.append(f'M{x} {HEADER_HEIGHT}V{height}')
+
+    with atomic_output(output_path) as tmp, open(tmp, 'w', encoding='utf-8', buffering=WRITE_BUFFER) as f:
+        f.write(
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{TOTAL_WIDTH}" height="{height}" '
+            f'viewBox="0 0 {TOTAL_WIDTH} {height}">\n'
+            f'<style>text{{font-family:{SVG_FONT};font-size:{CELL_SIZE}px;text-anchor:middle;'
+            f'fill:{_rgb(TEXT_COLOR)}}}.h{{fill:{_rgb(HEADER_TEXT_COLOR)};font-size:{HEADER_SIZE}px}}'
+            f'.t{{font-size:{TITLE_SIZE}px}}.l{{text-anchor:start}}</style>\n'
+            # Two rows per tile: plain then shaded (even ranks), each with its bottom rule
+            f'<defs><pattern id="rows" width="{TOTAL_WIDTH}" height="{2 * ROW_HEIGHT}" '
+            f'y="{HEADER_HEIGHT}" patternUnits="userSpaceOnUse">'
+            f'<rect y="{ROW_HEIGHT}" width="{TOTAL_WIDTH}" height="{ROW_HEIGHT}" fill="{_rgb(ALT_ROW_COLOR)}"/>'
+            f'<path d="M0 {ROW_HEIGHT - 0.5}H{TOTAL_WIDTH}M0 {2 * ROW_HEIGHT - 0.5}H{TOTAL_WIDTH}" '
+            f'stroke="{_rgb(BORDER_COLOR)}"/></pattern></defs>\n'
+            f'<rect width="{TOTAL_WIDTH}" height="{height}" fill="{_rgb(BG_COLOR)}"/>\n'
+            f'<rect y="{HEADER_HEIGHT}" width="{TOTAL_WIDTH}" height="{height - HEADER_HEIGHT}" fill="url(#rows)"/>\n'
+            f'<rect width="{TOTAL_WIDTH}" height="{HEADER_HEIGHT}" fill="{_rgb(HEADER_COLOR)}"/>\n'
+            f'<text class="h t" x="{TOTAL_WIDTH // 2}" y="{TITLE_BASELINE}">{escape(f"JPred {year} - All Entrants")}</text>\n'
+            f'<text class="h" y="{HEADER_BASELINE}">'
+            + ''.join(f'<tspan x="{x}">{escape(header)}</tspan>' for x, header in zip(xs, HEADERS))
+            + '</text>\n'
+        )
 
-        # Draw horizontal border
-        draw.line([(0, y + row_height), (total_width, y + row_height)], fill=border_color)
-        y += row_height
+        y = HEADER_HEIGHT + CELL_BASELINE
+        for rank, entry in enumerate(leaderboard, 1):
+            f.write(
+                f'<text y="{y}"><tspan x="{xs[0]}">{rank}</tspan>'
+                f'<tspan x="{xs[1]}" class="l">{escape(entry["name"][:50])}</tspan>'
+                f'<tspan x="{xs[2]}">{entry["points"]}</tspan><tspan x="{xs[3]}">{entry["exact"]}</tspan>'
+                f'<tspan x="{xs[4]}">{entry["j1"]}</tspan><tspan x="{xs[5]}">{entry["j2j3"]}</tspan></text>\n'
+            )
+            y += ROW_HEIGHT
 
-    # Draw outer border
-    draw.rectangle([0, 0, total_width - 1, total_height - 1], outline=border_color, width=2)
+        f.write(
+            f'<path d="{"".join(borders)}" stroke="{_rgb(BORDER_COLOR)}"/>\n'
+            f'<rect x="1" y="1" width="{TOTAL_WIDTH - 2}" height="{height - 2}" fill="none" '
+            f'stroke="{_rgb(BORDER_COLOR)}" stroke-width="2"/>\n'
+            '</svg>\n'
+        )
+    instrument.record_write(output_path)
+    if manifest is not None:
+        manifest.record(output_path, key)
+    print(f"Leaderboard SVG saved to {output_path}")
 
-    # Save image
-    img.save(output_path)
-    print(f"Leaderboard image saved to {output_path}")
 
 @click.command()
-@click.option('--output', '-o', default='docs/leaderboard.png', help='Output PNG file path')
-def main(output):
-    """Generate a PNG image of the JPred leaderboard table."""
+@click.option('--output', '-o', default=None,
+              help='Output file path (default: docs/leaderboard.png, or .svg with --format svg)')
+@click.option('--format', 'output_format', type=click.Choice(['png', 'svg']), default='png', show_default=True,
+              help='PNG pages, or a single streamed SVG.')
+@click.option('--jobs', '-j', default=1, show_default=True, help='Worker processes for rendering PNG pages.')
+@click.option('--profile', is_flag=True, help='Write cProfile stats and a Chrome trace to profile/.')
+def main(output, output_format, jobs, profile):
+    """Generate PNG images or an SVG of the JPred leaderboard table."""
+    output = output or f'docs/leaderboard.{output_format}'
 
     # Auto-detect year from tables directory structure
     tables_dir = Path('tables')
@@ -158,11 +363,15 @@ def main(output):
         print(f"Error: Database {db_path} not found. Run make_all.sh first.")
         exit(1)
 
-    print(f"Generating leaderboard for year {year}...")
-    leaderboard = get_leaderboard_data(db_path)
+    with instrument.run('generate_leaderboard_image', profile):
+        print(f"Generating leaderboard for year {year}...")
+        leaderboard = get_leaderboard_data(db_path)
 
-    print(f"Found {len(leaderboard)} entrants")
-    create_leaderboard_image(leaderboard, output, year)
+        print(f"Found {len(leaderboard)} entrants")
+        if output_format == 'svg':
+            create_leaderboard_svg(leaderboard, output, year)
+        else:
+            create_leaderboard_image(leaderboard, output, year, jobs)
 
 if __name__ == '__main__':
     main()
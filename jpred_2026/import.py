@@ -12,26 +12,283 @@ Import JPred predictions from CSV to SQLite database.
 This module reads JPred form responses from a CSV file and imports them into an SQLite
 database. It performs several data processing steps:
 - Normalizes column names to match the expected schema
-- Maps team names from form responses to standardized table names
+- Maps team names from form responses to the team registry's English names
+  (labels/team_registry.tsv, see team_registry.py)
 - Removes duplicate submissions (keeping only the latest per email)
 - Obfuscates email addresses for privacy
 - Makes duplicate participant names unique by appending obfuscated emails
 
+Besides the wide jpred table (one column per prediction), the importer writes
+a normalized copy keyed by integer IDs:
+
+    users(user_id, name, email)               user_id is the jpred rowid
+    teams(team_id, name)                      team_id is the registry TeamId
+    predictions(user_id, "group", slot, team_id)
+
+"group" is the cols/{group}.cols file the column comes from and slot its
+0-based line in that file. predictions is indexed on ("group", slot, team_id)
+and on (team_id), so per-slot counts and per-team lookups are index-only.
+
 Usage:
-    import.py [YEAR]
+    import.py [YEAR] [--chunksize N] [--incremental]
+
+With --chunksize the export is streamed N rows at a time into a temporary
+submissions table (latest submission per email kept by an upsert) and the jpred
+table is written from it in one INSERT ... SELECT, so memory stays flat however
+large the export is. The resulting tables are identical to the default path.
+
+Every import also records what it kept in form_submissions (one row per email,
+keyed by a hash of the address) and the export's latest Timestamp in
+import_state. With --incremental only rows at or after that high-water mark
+are considered, and only the submissions among them that are new or edited are
+applied, in one transaction. The tables match a full import except that
+user_id (the jpred rowid) is not renumbered. The importer falls back to a full
+import when the form's columns change, rows are deleted, or there is no state.
 
 Example:
     import.py 2025
     import.py  # auto-detects year from tables/ directory
 """
 
+import hashlib
+import json
 import pandas as pd
 import sqlite3
 import click
 from pathlib import Path
 from email_tools import obfuscate_email
+import instrument
+import team_registry
+
+# Prediction groups, one cols/{group}.cols file each
+GROUPS = [
+    "j1_winner",
+    "j1_east",
+    "j1_west",
+    "j2_3_winner",
+    "j2_3_east_a",
+    "j2_3_east_b",
+    "j2_3_west_a",
+    "j2_3_west_b",
+]
+
+
+def load_group_columns(cols_dir='cols'):
+    """Return {group: [column, ...]} for every group with a cols file."""
+    group_columns = {}
+    for group in GROUPS:
+        cols_file = Path(cols_dir) / f'{group}.cols'
+        if cols_file.exists():
+            group_columns[group] = [c.strip() for c in cols_file.read_text().splitlines() if c.strip()]
+    return group_columns
+
+
+NORMALIZED_SCHEMA = """
+    DROP TABLE IF EXISTS predictions;
+    DROP TABLE IF EXISTS users;
+    DROP TABLE IF EXISTS teams;
+    CREATE TABLE users (
+        user_id INTEGER PRIMARY KEY,
+        name    TEXT NOT NULL,
+        email   TEXT
+    );
+    CREATE TABLE teams (
+        team_id INTEGER PRIMARY KEY,
+        name    TEXT NOT NULL UNIQUE
+    );
+    CREATE TABLE predictions (
+        user_id INTEGER NOT NULL REFERENCES users(user_id),
+        "group" TEXT    NOT NULL,
+        slot    INTEGER NOT NULL,
+        team_id INTEGER NOT NULL REFERENCES teams(team_id),
+        PRIMARY KEY (user_id, "group", slot)
+    ) WITHOUT ROWID;
+"""
+
+
+def prediction_slots(conn, table_name, group_columns):
+    """Return [(group, slot, column)] for every prediction column present in the table."""
+    existing = {row[1] for row in conn.execute(f'PRAGMA table_info("{table_name}")')}
+    return [
+        (group, slot, col)
+        for group, columns in group_columns.items()
+        for slot, col in enumerate(columns)
+        if col in existing
+    ]
+
+
+def insert_normalized_rows(conn, table_name, slots, where=''):
+    """Insert users, any new team names and predictions for the wide-table rows matching where.
+
+    where is a SQL WHERE clause on the wide table ('' for every row).
+    Predictions are inserted in primary key order, which keeps the WITHOUT ROWID
+    b-tree appends sequential instead of one random insert per slot.
+    """
+    existing = {row[1] for row in conn.execute(f'PRAGMA table_info("{table_name}")')}
+    email = '"Email"' if 'Email' in existing else 'NULL'
+    conn.execute(f'INSERT INTO users (user_id, name, email) '
+                 f'SELECT rowid, "Name", {email} FROM "{table_name}" {where}')
+    if not slots:
+        return
+
+    picked = ' UNION '.join(
+        f'SELECT "{col}" AS name FROM "{table_name}" {where} {"AND" if where else "WHERE"} '
+        f'"{col}" IS NOT NULL AND "{col}" != \'\''
+        for _, _, col in slots
+    )
+    conn.execute(f'INSERT OR IGNORE INTO teams (name) SELECT name FROM ({picked}) ORDER BY name')
+
+    picks = ' UNION ALL '.join(
+        f'SELECT rowid AS user_id, \'{group}\' AS "group", {slot} AS slot, "{col}" AS name '
+        f'FROM "{table_name}" {where}'
+        for group, slot, col in slots
+    )
+    conn.execute(
+        f'INSERT INTO predictions (user_id, "group", slot, team_id) '
+        f'SELECT p.user_id, p."group", p.slot, t.team_id FROM ({picks}) p '
+        f'JOIN teams t ON t.name = p.name ORDER BY p.user_id, p."group", p.slot'
+    )
+
+
+def write_normalized_tables(conn, table_name, group_columns):
+    """Rebuild users, teams and predictions from the wide table in one transaction."""
+    slots = prediction_slots(conn, table_name, group_columns)
+
+    with conn:
+        conn.executescript(NORMALIZED_SCHEMA)
+        # Registry teams keep their TeamId; other names picked are numbered after them
+        registry = team_registry.load_registry()
+        conn.executemany('INSERT INTO teams (team_id, name) VALUES (?, ?)',
+                         ((team_id, registry.display_name(team_id)) for team_id in registry.names))
+        insert_normalized_rows(conn, table_name, slots)
+        conn.executescript("""
+            CREATE INDEX idx_predictions_group_slot_team ON predictions ("group", slot, team_id);
+            CREATE INDEX idx_predictions_team ON predictions (team_id);
+        """)
+
+    users = conn.execute('SELECT COUNT(*) FROM users').fetchone()[0]
+    teams = conn.execute('SELECT COUNT(*) FROM teams').fetchone()[0]
+    predictions = conn.execute('SELECT COUNT(*) FROM predictions').fetchone()[0]
+    print(f"Wrote normalized tables: {users} users, {teams} teams, {predictions} predictions")
+
+# Form export headers -> jpred column names
+COLUMN_MAPPING = {
+    'Column 1': 'Name',
+    'Name or Nickname': 'Name',
+    'Contact Email Address (Not Published)': 'Email',
+}
+
+TIMESTAMP_FORMAT = '%d/%m/%Y %H:%M:%S'
+
+# How DataFrame.to_sql stores a timestamp; also used for the high-water mark
+DB_TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Rows read at a time when scanning the export for new submissions
+INCREMENTAL_CHUNKSIZE = 50000
+
+# What the last import kept, so the next --incremental run can skip it.
+# Emails are stored only as a hash.
+STATE_SCHEMA = """
+    DROP TABLE IF EXISTS form_submissions;
+    DROP TABLE IF EXISTS import_state;
+    CREATE TABLE form_submissions (
+        email_key  TEXT PRIMARY KEY,   -- sha256 of the submitted email
+        user_id    INTEGER NOT NULL,   -- jpred rowid of the kept submission
+        timestamp  TEXT,
+        source_row INTEGER NOT NULL,   -- 0-based row in the export
+        name       TEXT                -- name as submitted, before disambiguation
+    );
+    CREATE INDEX idx_form_submissions_name ON form_submissions (name);
+    CREATE TABLE import_state (
+        key   TEXT PRIMARY KEY,
+        value TEXT
+    );
+"""
+
+
+def canonicalize_teams(df, group_columns):
+    """Replace every pick in df with its registry display (English) name, in place."""
+    columns = [col for cols in group_columns.values() for col in cols]
+    team_registry.load_registry().canonicalize(df, columns)
+
+
+def _obfuscate_or_null(email):
+    return None if email is None else obfuscate_email(email)
+
+
+def email_key(email):
+    """Return the key a submission is stored under in form_submissions."""
+    return hashlib.sha256(('' if email is None else email).encode('utf-8')).hexdigest()
+
+
+def _none_for_nan(values):
+    return values.astype(object).where(values.notna(), None)
+
+
+def column_kinds(chunk, kinds=None):
+    """Fold a chunk of string columns into {column: set of kinds} ('int', 'float', 'text', 'na').
+
+    Each value is classed the way pd.read_csv would parse it, so column_dtypes
+    can give a streamed import the types a whole-file read would infer.
+    """
+    kinds = {} if kinds is None else kinds
+    for col in chunk.columns:
+        seen = kinds.setdefault(col, set())
+        values = chunk[col]
+        present = values.dropna()
+        if len(present) < len(values):
+            seen.add('na')
+        if present.empty or 'text' in seen:
+            continue
+        numbers = pd.to_numeric(present, errors='coerce')
+        if numbers.isna().any():
+            seen.add('text')
+        else:
+            seen.add('int' if pd.api.types.is_integer_dtype(numbers) else 'float')
+    return kinds
+
+
+def column_dtypes(kinds):
+    """Return {column: dtype} for column_kinds output, as pd.read_csv infers it for the whole file."""
+    dtypes = {}
+    for col, seen in kinds.items():
+        if 'text' in seen:
+            dtypes[col] = object
+        elif seen == {'int'}:
+            dtypes[col] = 'int64'
+        else:
+            # Integers with blanks, decimals, or nothing at all read as float
+            dtypes[col] = 'float64'
+    return dtypes
+
+
+def save_import_state(conn, columns, rows):
+    """Record the export's columns, row count and latest Timestamp after an import.
+
+    form_submissions must already hold one row per kept submission.
+    """
+    high_water = conn.execute('SELECT MAX(timestamp) FROM form_submissions').fetchone()[0]
+    conn.executemany('INSERT OR REPLACE INTO import_state (key, value) VALUES (?, ?)', [
+        ('columns', json.dumps(columns)),
+        ('rows', json.dumps(rows)),
+        ('high_water', json.dumps(high_water)),
+    ])
 
-def csv_to_sqlite(csv_file_path, sqlite_db_path, table_name):
+
+def load_import_state(conn, table_name, normalized=True):
+    """Return {'columns', 'rows', 'high_water'} from the last import, or None."""
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    required = {table_name, 'form_submissions', 'import_state'}
+    if normalized:
+        required |= {'users', 'teams', 'predictions'}
+    if not required <= tables:
+        return None
+    state = {key: json.loads(value) for key, value in conn.execute('SELECT key, value FROM import_state')}
+    return state if {'columns', 'rows', 'high_water'} <= set(state) else None
+
+
+@instrument.stage('import tsv')
+def csv_to_sqlite(csv_file_path, sqlite_db_path, table_name, chunksize=None, incremental=False):
     """
     Reads a CSV or TSV file into a pandas DataFrame and inserts it into an SQLite database.
 
@@ -39,79 +296,337 @@ def csv_to_sqlite(csv_file_path, sqlite_db_path, table_name):
     - csv_file_path: The file path of the CSV/TSV file.
     - sqlite_db_path: The file path of the SQLite database.
     - table_name: The name of the table where the data will be inserted.
+    - chunksize: If given, stream the file in chunks of this many rows instead
+      of loading it whole (see stream_csv_to_sqlite).
+    - incremental: Apply only the submissions added or edited since the last
+      import (see import_new_submissions), falling back to a full import when
+      that is not possible.
     """
-    sep = '\t' if str(csv_file_path).endswith('.tsv') else ','
-    df = pd.read_csv(csv_file_path, sep=sep)
-
-    column_mapping = {
-        'Column 1': 'Name',
-        'Name or Nickname': 'Name',
-        'Contact Email Address (Not Published)': 'Email',
-    }
-
-    df.rename(columns=column_mapping, inplace=True)
+    if incremental and import_new_submissions(csv_file_path, sqlite_db_path, table_name, chunksize):
+        return
+    if chunksize:
+        return stream_csv_to_sqlite(csv_file_path, sqlite_db_path, table_name, chunksize)
 
-    # Normalize team names to match JSON table names
-    team_mapping_file = Path('team_name_mapping.csv')
-    if team_mapping_file.exists():
-        team_mapping_df = pd.read_csv(team_mapping_file)
-        team_mapping = dict(zip(team_mapping_df['FormName'], team_mapping_df['TableName']))
-
-        # Apply mapping to all prediction columns (any column with "Place" in the name)
-        prediction_columns = [col for col in df.columns if 'Place' in col]
+    sep = '\t' if str(csv_file_path).endswith('.tsv') else ','
+    with instrument.stage('read'):
+        df = pd.read_csv(csv_file_path, sep=sep)
 
-        for col in prediction_columns:
-            if col in df.columns:
-                df[col] = df[col].map(lambda x: team_mapping.get(x, x) if pd.notna(x) else x)
+    df.rename(columns=COLUMN_MAPPING, inplace=True)
 
-        mapped_count = len(team_mapping)
-        print(f"Applied {mapped_count} team name mappings")
+    # Normalize team names to the registry names the standings tables use
+    group_columns = load_group_columns()
+    canonicalize_teams(df, group_columns)
 
     # Remove duplicate submissions - keep only the latest submission per email
-    if 'Email' in df.columns and 'Timestamp' in df.columns:
-        original_count = len(df)
-        # Sort by Timestamp to ensure latest is kept
-        df['Timestamp'] = pd.to_datetime(df['Timestamp'], format='%d/%m/%Y %H:%M:%S', errors='coerce')
-        df = df.sort_values('Timestamp')
+    original_count = len(df)
+    dedupe = 'Email' in df.columns and 'Timestamp' in df.columns
+    if dedupe:
+        # Sort by Timestamp to ensure latest is kept (stable: ties keep file order)
+        df['Timestamp'] = pd.to_datetime(df['Timestamp'], format=TIMESTAMP_FORMAT, errors='coerce')
+        df = df.sort_values('Timestamp', kind='stable')
         # Keep last (latest) submission per email
         df = df.drop_duplicates(subset='Email', keep='last')
         removed_count = original_count - len(df)
         if removed_count > 0:
             print(f"Removed {removed_count} duplicate submission(s), keeping latest per email")
 
+        # What was kept, for the next --incremental import
+        submissions = list(zip(
+            df['Email'].fillna('').map(email_key),
+            range(1, len(df) + 1),
+            _none_for_nan(df['Timestamp'].dt.strftime(DB_TIMESTAMP_FORMAT)),
+            df.index.tolist(),
+            _none_for_nan(df['Name']) if 'Name' in df.columns else [None] * len(df),
+        ))
+
     # Obfuscate all email addresses in the database
     if 'Email' in df.columns:
         df['Email'] = df['Email'].apply(obfuscate_email)
         print("Obfuscated all email addresses")
 
-    # Make duplicate names unique by appending obfuscated email
+    # Make duplicate names unique by appending obfuscated email to ALL instances
     if 'Name' in df.columns and 'Email' in df.columns:
-        # Find duplicate names
-        name_counts = df['Name'].value_counts()
-        duplicate_names = name_counts[name_counts > 1].index.tolist()
-
-        if duplicate_names:
-            for dup_name in duplicate_names:
-                # For each duplicate name, append obfuscated email to ALL instances
-                mask = df['Name'] == dup_name
-                emails = df.loc[mask, 'Email'].values
-                for row_idx, email in zip(df[mask].index, emails):
-                    df.loc[row_idx, 'Name'] = f"{dup_name} ({email})"
-            print(f"Made {len(duplicate_names)} duplicate name(s) unique")
+        duplicated = df['Name'].notna() & df['Name'].duplicated(keep=False)
+        if duplicated.any():
+            names = df.loc[duplicated, 'Name']
+            df.loc[duplicated, 'Name'] = names.astype(str) + ' (' + df.loc[duplicated, 'Email'].astype(str) + ')'
+            print(f"Made {names.nunique()} duplicate name(s) unique")
 
     # Connect to the SQLite database
-    conn = sqlite3.connect(sqlite_db_path)
+    conn = instrument.trace(sqlite3.connect(sqlite_db_path))
 
     # Write the data to a SQLite table
-    df.to_sql(table_name, conn, if_exists='replace', index=False)
+    with instrument.stage('write jpred'):
+        df.to_sql(table_name, conn, if_exists='replace', index=False)
+        with conn:
+            conn.executescript(STATE_SCHEMA)
+            if dedupe:
+                conn.executemany('INSERT INTO form_submissions VALUES (?, ?, ?, ?, ?)', submissions)
+                save_import_state(conn, list(df.columns), original_count)
+
+    # Normalized long-format copy for indexed queries
+    if group_columns:
+        with instrument.stage('normalized tables'):
+            write_normalized_tables(conn, table_name, group_columns)
 
     # Close the database connection
     conn.close()
     print(f"Data from {csv_file_path} has been inserted into {table_name} table in {sqlite_db_path} database.")
 
+
+def stream_csv_to_sqlite(csv_file_path, sqlite_db_path, table_name, chunksize):
+    """Import a form export of any size with memory bounded by chunksize.
+
+    Produces the same table as the in-memory path of csv_to_sqlite. Rows are
+    read chunksize at a time and upserted into a temporary submissions table
+    keyed by email, so only the latest submission per email is kept
+    (INSERT ... ON CONFLICT DO UPDATE WHERE the new row is not older). The
+    table is then written in one INSERT ... SELECT. Emails are obfuscated by a
+    registered SQLite function, and duplicate names are made unique with
+    COUNT(*) OVER (PARTITION BY Name).
+
+    Rows are read as strings, but the kind of every value is tracked as it
+    streams past (column_kinds), so the table gets the INTEGER/REAL/TEXT
+    columns a whole-file pd.read_csv would have given it, and SQLite's column
+    affinity converts the values on the INSERT ... SELECT.
+    """
+    sep = '\t' if str(csv_file_path).endswith('.tsv') else ','
+    conn = instrument.trace(sqlite3.connect(sqlite_db_path))
+    conn.create_function('obfuscate_email', 1, _obfuscate_or_null, deterministic=True)
+    conn.create_function('email_key', 1, email_key, deterministic=True)
+    group_columns = load_group_columns()
+
+    columns = None
+    dedupe = False
+    kinds = {}
+    total = 0
+    with instrument.stage('read'):
+        for chunk in pd.read_csv(csv_file_path, sep=sep, chunksize=chunksize, dtype=str):
+            chunk.rename(columns=COLUMN_MAPPING, inplace=True)
+            canonicalize_teams(chunk, group_columns)
+
+            if columns is None:
+                columns = list(chunk.columns)
+                dedupe = 'Email' in columns and 'Timestamp' in columns
+                quoted = [f'"{c}"' for c in columns]
+                conn.execute('DROP TABLE IF EXISTS temp.submissions')
+                conn.execute(f'CREATE TEMP TABLE submissions (_key TEXT PRIMARY KEY, _row INTEGER, '
+                             f'{", ".join(quoted)})')
+                upsert = (f'INSERT INTO submissions (_key, _row, {", ".join(quoted)}) '
+                          f'VALUES ({", ".join("?" * (len(columns) + 2))})')
+                if dedupe:
+                    upsert += (' ON CONFLICT(_key) DO UPDATE SET _row = excluded._row, '
+                               + ', '.join(f'{q} = excluded.{q}' for q in quoted)
+                               + ' WHERE excluded."Timestamp" IS NULL'
+                               ' OR excluded."Timestamp" >= submissions."Timestamp"')
+
+            column_kinds(chunk.drop(columns='Timestamp') if dedupe else chunk, kinds)
+            if dedupe:
+                timestamps = pd.to_datetime(chunk['Timestamp'], format=TIMESTAMP_FORMAT, errors='coerce')
+                chunk['Timestamp'] = timestamps.dt.strftime(DB_TIMESTAMP_FORMAT)
+            rows = range(total, total + len(chunk))
+            keys = chunk['Email'].fillna('') if dedupe else pd.Series(rows, index=chunk.index).astype(str)
+            values = chunk[columns].astype(object).where(chunk[columns].notna(), None)
+            with conn:
+                conn.executemany(upsert, (
+                    (key, row, *vals)
+                    for key, row, vals in zip(keys, rows, values.itertuples(index=False, name=None))
+                ))
+            total += len(chunk)
+
+    if columns is None:
+        conn.close()
+        print(f"No rows in {csv_file_path}")
+        return
+
+    # Same column types as DataFrame.to_sql would create for a whole-file read
+    dtypes = column_dtypes(kinds)
+    if dedupe:
+        dtypes['Timestamp'] = 'datetime64[ns]'
+    empty = pd.DataFrame({col: pd.Series(dtype=dtypes[col]) for col in columns})
+    schema = pd.io.sql.get_schema(empty, table_name, con=conn)
+
+    kept = conn.execute('SELECT COUNT(*) FROM submissions').fetchone()[0]
+    if kept < total:
+        print(f"Removed {total - kept} duplicate submission(s), keeping latest per email")
+
+    select = []
+    for col in columns:
+        if col == 'Email':
+            select.append('obfuscate_email("Email")')
+        elif col == 'Name' and 'Email' in columns:
+            select.append('CASE WHEN "Name" IS NOT NULL AND COUNT(*) OVER (PARTITION BY "Name") > 1 '
+                          'THEN "Name" || \' (\' || obfuscate_email("Email") || \')\' ELSE "Name" END')
+        else:
+            select.append(f'"{col}"')
+    order = '"Timestamp" IS NULL, "Timestamp", _row' if dedupe else '_row'
+
+    with instrument.stage('write jpred'):
+        with conn:
+            conn.execute(f'DROP TABLE IF EXISTS "{table_name}"')
+            conn.execute(schema)
+            conn.execute(f'INSERT INTO "{table_name}" SELECT {", ".join(select)} FROM submissions ORDER BY {order}')
+        if 'Email' in columns:
+            print("Obfuscated all email addresses")
+        if 'Name' in columns and 'Email' in columns:
+            duplicate_names = conn.execute(
+                'SELECT COUNT(*) FROM (SELECT 1 FROM submissions WHERE "Name" IS NOT NULL '
+                'GROUP BY "Name" HAVING COUNT(*) > 1)').fetchone()[0]
+            if duplicate_names:
+                print(f"Made {duplicate_names} duplicate name(s) unique")
+        with conn:
+            conn.executescript(STATE_SCHEMA)
+            if dedupe:
+                name = '"Name"' if 'Name' in columns else 'NULL'
+                conn.execute(f'INSERT INTO form_submissions SELECT email_key("Email"), '
+                             f'ROW_NUMBER() OVER (ORDER BY {order}), "Timestamp", _row, {name} FROM submissions')
+                save_import_state(conn, columns, total)
+        conn.execute('DROP TABLE submissions')
+
+    if group_columns:
+        with instrument.stage('normalized tables'):
+            write_normalized_tables(conn, table_name, group_columns)
+
+    conn.close()
+    print(f"Streamed {total} rows from {csv_file_path} into {table_name} table in {sqlite_db_path} database.")
+
+
+def read_submissions_since(csv_file_path, sep, chunksize, high_water):
+    """Scan the export for rows stamped at or after high_water.
+
+    Returns (rows, total rows, rows without a valid Timestamp). rows is indexed
+    by the 0-based row in the export, with Timestamp in DB_TIMESTAMP_FORMAT.
+    """
+    kept = []
+    total = undated = 0
+    for chunk in pd.read_csv(csv_file_path, sep=sep, chunksize=chunksize, dtype=str):
+        chunk.rename(columns=COLUMN_MAPPING, inplace=True)
+        chunk.index = range(total, total + len(chunk))
+        total += len(chunk)
+        timestamps = pd.to_datetime(chunk['Timestamp'], format=TIMESTAMP_FORMAT, errors='coerce')
+        undated += int(timestamps.isna().sum())
+        chunk['Timestamp'] = timestamps.dt.strftime(DB_TIMESTAMP_FORMAT)
+        if high_water is not None:
+            chunk = chunk[chunk['Timestamp'].notna() & (chunk['Timestamp'] >= high_water)]
+        kept.append(chunk)
+    return pd.concat(kept), total, undated
+
+
+def import_new_submissions(csv_file_path, sqlite_db_path, table_name, chunksize=None):
+    """Apply only the submissions added or edited since the last import.
+
+    The export is scanned for rows stamped at or after the previous import's
+    latest Timestamp (the high-water mark). Of those, rows whose submission is
+    already stored in form_submissions (same email, row and Timestamp) are
+    skipped. Each remaining submission replaces its email's earlier row: the old
+    jpred, users and predictions rows are deleted and the new one appended, so
+    jpred stays in Timestamp order exactly as a full import would write it.
+    Team-name mapping and email obfuscation run on the new rows only, and only
+    names shared with a new or replaced submission are re-disambiguated. All of
+    it happens in one transaction.
+
+    Returns False without touching the database when a full import is needed:
+    no state from a previous import, the form's columns changed, rows were
+    deleted from the export, or a row has no valid Timestamp.
+    """
+    sep = '\t' if str(csv_file_path).endswith('.tsv') else ','
+    group_columns = load_group_columns()
+    conn = instrument.trace(sqlite3.connect(sqlite_db_path))
+    state = load_import_state(conn, table_name, normalized=bool(group_columns))
+    columns = list(pd.read_csv(csv_file_path, sep=sep, nrows=0).rename(columns=COLUMN_MAPPING).columns)
+
+    reason = None
+    if state is None:
+        reason = 'no state from a previous import'
+    elif state['columns'] != columns:
+        reason = 'the form columns changed'
+    else:
+        with instrument.stage('read'):
+            new, total, undated = read_submissions_since(
+                csv_file_path, sep, chunksize or INCREMENTAL_CHUNKSIZE, state['high_water'])
+        if undated:
+            reason = f'{undated} row(s) without a valid Timestamp'
+        elif total < state['rows']:
+            reason = f"the export has fewer rows than last time ({total} < {state['rows']})"
+    if reason:
+        conn.close()
+        print(f"Full import needed: {reason}")
+        return False
+
+    # Latest submission per email among the new rows (ties keep file order)
+    new = new.sort_values('Timestamp', kind='stable').drop_duplicates(subset='Email', keep='last')
+    keys = new['Email'].fillna('').map(email_key)
+    names = _none_for_nan(new['Name']) if 'Name' in columns else pd.Series(None, index=new.index)
+
+    with instrument.stage('apply'), conn:
+        conn.execute('CREATE TEMP TABLE incoming (email_key TEXT PRIMARY KEY, timestamp TEXT, '
+                     'source_row INTEGER, name TEXT)')
+        conn.executemany('INSERT INTO incoming VALUES (?, ?, ?, ?)',
+                         zip(keys, new['Timestamp'], new.index.tolist(), names))
+        conn.execute('DELETE FROM incoming WHERE EXISTS (SELECT 1 FROM form_submissions s '
+                     'WHERE s.email_key = incoming.email_key AND s.source_row = incoming.source_row '
+                     'AND s.timestamp IS incoming.timestamp)')
+        changed = keys.isin({row[0] for row in conn.execute('SELECT email_key FROM incoming')})
+        new, keys, names = new[changed].copy(), keys[changed], names[changed]
+
+        conn.execute('CREATE TEMP TABLE replaced AS SELECT s.user_id, s.name FROM form_submissions s '
+                     'JOIN incoming USING (email_key)')
+        replaced = conn.execute('SELECT COUNT(*) FROM replaced').fetchone()[0]
+        if group_columns:
+            conn.execute('DELETE FROM predictions WHERE user_id IN (SELECT user_id FROM replaced)')
+            conn.execute('DELETE FROM users WHERE user_id IN (SELECT user_id FROM replaced)')
+        conn.execute(f'DELETE FROM "{table_name}" WHERE rowid IN (SELECT user_id FROM replaced)')
+
+        canonicalize_teams(new, group_columns)
+        values = _none_for_nan(new[columns])
+        values['Email'] = values['Email'].map(_obfuscate_or_null)
+        quoted = ', '.join(f'"{c}"' for c in columns)
+        insert = f'INSERT INTO "{table_name}" ({quoted}) VALUES ({", ".join("?" * len(columns))})'
+        user_ids = [conn.execute(insert, row).lastrowid for row in values.itertuples(index=False, name=None)]
+        conn.executemany('INSERT OR REPLACE INTO form_submissions VALUES (?, ?, ?, ?, ?)',
+                         zip(keys, user_ids, new['Timestamp'], new.index.tolist(), names))
+
+        if 'Name' in columns:
+            # Every submission sharing a name with a new or replaced one
+            conn.execute('CREATE TEMP TABLE renamed AS '
+                         'SELECT user_id, name, COUNT(*) OVER (PARTITION BY name) AS n FROM form_submissions '
+                         'WHERE name IN (SELECT name FROM incoming UNION SELECT name FROM replaced)')
+            conn.execute(f'UPDATE "{table_name}" SET "Name" = CASE WHEN r.n > 1 '
+                         f'THEN r.name || \' (\' || "{table_name}"."Email" || \')\' ELSE r.name END '
+                         f'FROM renamed r WHERE "{table_name}".rowid = r.user_id')
+
+        if group_columns:
+            conn.execute('CREATE TEMP TABLE added (user_id INTEGER PRIMARY KEY)')
+            conn.executemany('INSERT INTO added VALUES (?)', ((user_id,) for user_id in user_ids))
+            slots = prediction_slots(conn, table_name, group_columns)
+            insert_normalized_rows(conn, table_name, slots, 'WHERE rowid IN (SELECT user_id FROM added)')
+            if 'Name' in columns:
+                conn.execute(f'UPDATE users SET name = j."Name" FROM "{table_name}" j '
+                             f'WHERE j.rowid = users.user_id AND users.user_id IN (SELECT user_id FROM renamed)')
+            conn.execute('DELETE FROM teams WHERE team_id > ? AND team_id NOT IN (SELECT team_id FROM predictions)',
+                         (team_registry.load_registry().max_id,))
+            conn.execute('DROP TABLE added')
+
+        save_import_state(conn, columns, total)
+        for temp_table in ('incoming', 'replaced', 'renamed'):
+            conn.execute(f'DROP TABLE IF EXISTS temp.{temp_table}')
+
+    conn.close()
+    if len(new):
+        print(f"Applied {len(new) - replaced} new and {replaced} updated submission(s) "
+              f"since {state['high_water']} to {table_name} table in {sqlite_db_path} database.")
+    else:
+        print(f"No new submissions in {csv_file_path} since {state['high_water']}")
+    return True
+
 @click.command()
 @click.argument('year', required=False)
-def main(year):
+@click.option('--chunksize', type=int, default=None,
+              help='Stream the export this many rows at a time (bounded memory for huge exports).')
+@click.option('--incremental', is_flag=True,
+              help='Apply only submissions added or edited since the last import.')
+@click.option('--profile', is_flag=True, help='Write cProfile stats and a Chrome trace to profile/.')
+def main(year, chunksize, incremental, profile):
     """Import JPred CSV data into SQLite database.
 
     YEAR: The year to process (e.g., 2025). If not provided, auto-detects from tables/ directory.
@@ -132,7 +647,8 @@ def main(year):
     sqlite_db_path = f'jpred_{year}.db'
     table_name = 'jpred'
 
-    csv_to_sqlite(csv_file_path, sqlite_db_path, table_name)
+    with instrument.run('import', profile):
+        csv_to_sqlite(csv_file_path, sqlite_db_path, table_name, chunksize, incremental)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,155 @@
+"""
+Build instrumentation shared by the pipeline scripts.
+
+Each script wraps its work in instrument.run(name, profile) and its steps in
+instrument.stage(name). Stages nest; for each one the module records:
+
+  - wall and CPU time (CPU time of this process; --jobs workers are not included)
+  - SQL statements run on connections registered with trace(conn); SQLite
+    reports each row of an executemany (and each implicit BEGIN/COMMIT) as
+    one statement, so this is not a count of execute calls
+  - pages rendered and bytes written (write_page and record_write)
+
+run() prints a summary table when the script finishes. With profile=True it
+also runs cProfile over the whole script and writes, under profile/:
+
+  {name}.pstats      cProfile stats (python -m pstats profile/{name}.pstats)
+  {name}.trace.json  Chrome trace of the stages (chrome://tracing or ui.perfetto.dev)
+"""
+import cProfile
+import json
+import os
+import pstats
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+PROFILE_DIR = Path('profile')
+
+# Running totals for this process; each stage records the change over its lifetime
+counters = {'statements': 0, 'pages': 0, 'bytes': 0}
+
+# Stages in the order they were entered; filled in as they finish
+_stages = []
+_depth = 0
+_origin = time.perf_counter()
+
+
+def _count_statement(statement):
+    counters['statements'] += 1
+
+
+def trace(conn):
+    """Count every SQL statement run on conn. Returns conn."""
+    if conn is not None:
+        conn.set_trace_callback(_count_statement)
+    return conn
+
+
+def record_write(path, page=False):
+    """Count a file just written (page=True for a rendered HTML page)."""
+    counters['bytes'] += os.path.getsize(path)
+    if page:
+        counters['pages'] += 1
+
+
+def snapshot():
+    """Return a copy of the counters, for since()."""
+    return dict(counters)
+
+
+def since(before):
+    """Return the change in every counter since snapshot() returned before."""
+    return {k: counters[k] - before[k] for k in counters}
+
+
+def add(counts):
+    """Add counts from another process (e.g. a --jobs worker) to the totals."""
+    for k, v in counts.items():
+        counters[k] += v
+
+
+@contextmanager
+def stage(name):
+    """Time a step of the build and attribute the counters it moved to it."""
+    global _depth
+    entry = {'name': name, 'depth': _depth}
+    _stages.append(entry)
+    before = snapshot()
+    start, cpu = time.perf_counter(), time.process_time()
+    _depth += 1
+    try:
+        yield
+    finally:
+        _depth -= 1
+        entry.update(
+            start=start - _origin,
+            wall=time.perf_counter() - start,
+            cpu=time.process_time() - cpu,
+            **since(before),
+        )
+
+
+def _format_bytes(n):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if n < 1024 or unit == 'GB':
+            return f"{n:.0f} {unit}" if unit == 'B' else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+def print_summary():
+    """Print one row per finished stage, indented by nesting depth."""
+    finished = [s for s in _stages if 'wall' in s]
+    if not finished:
+        return
+    width = max(28, max(len(s['name']) + 2 * s['depth'] for s in finished) + 2)
+    print(f"\n{'Stage':<{width}}{'Wall s':>9}{'CPU s':>9}{'Statements':>12}{'Pages':>9}{'Written':>11}")
+    for s in finished:
+        label = '  ' * s['depth'] + s['name']
+        print(f"{label:<{width}}{s['wall']:>9.3f}{s['cpu']:>9.3f}{s['statements']:>12}"
+              f"{s['pages']:>9}{_format_bytes(s['bytes']):>11}")
+
+
+def write_trace(path):
+    """Write the finished stages as a Chrome trace (complete 'X' events)."""
+    pid = os.getpid()
+    events = [
+        {
+            'name': s['name'],
+            'ph':   'X',
+            'ts':   round(s['start'] * 1e6),
+            'dur':  round(s['wall'] * 1e6),
+            'pid':  pid,
+            'tid':  0,
+            'args': {k: s[k] for k in ('cpu', 'statements', 'pages', 'bytes')},
+        }
+        for s in _stages if 'wall' in s
+    ]
+    Path(path).write_text(json.dumps({'traceEvents': events, 'displayTimeUnit': 'ms'}))
+
+
+@contextmanager
+def run(name, profile=False):
+    """Instrument a whole script run: one top-level stage plus the summary.
+
+    With profile=True the run is profiled with cProfile and the pstats and
+    Chrome trace files are written to PROFILE_DIR.
+    """
+    profiler = cProfile.Profile() if profile else None
+    if profiler:
+        profiler.enable()
+    try:
+        with stage(name):
+            yield
+    finally:
+        if profiler:
+            profiler.disable()
+            PROFILE_DIR.mkdir(exist_ok=True)
+            stats_file = PROFILE_DIR / f'{name}.pstats'
+            trace_file = PROFILE_DIR / f'{name}.trace.json'
+            profiler.dump_stats(stats_file)
+            write_trace(trace_file)
+            print(f"\nTop functions by cumulative time ({stats_file}):")
+            pstats.Stats(profiler).sort_stats('cumulative').print_stats(15)
+            print(f"Chrome trace written to {trace_file}")
+        print_summary()
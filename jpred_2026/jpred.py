@@ -10,41 +10,100 @@
 """
 Generate an aggregate prediction summary HTML page for one group.
 
-Queries the jpred table for prediction counts per team per position column,
-then renders a template showing how many participants predicted each team.
+Queries the predictions table (written by import.py) for prediction counts per
+team per position column, then renders a template showing how many participants
+predicted each team. Each column is one ("group", slot) of predictions, so its
+counts come from the ("group", slot, team_id) index without touching the wide
+jpred table.
 If a league table exists for the group, teams are also ordered by current position
 and the results are exported to aggregated_data/{group}.csv.
 
+With --all, the counts for every (column, team) pair across all groups are
+computed up front (aggregate_columns), and every group page and CSV is written
+from that one result. build.py instead takes the counts from the team index it
+has already built for the teams page (counts_from_index), so the build reads
+predictions once for both.
+
 Usage:
     jpred.py docs/j1_east.html cols/j1_east.cols
+    jpred.py --all
 """
-import re
 import click
 import sqlite3
 import pandas as pd
-from jinja2 import Environment, FileSystemLoader
 from pathlib import Path
+import instrument
+from manifest import BuildManifest, write_page
+from rendering import get_environment
 
 
-def team_id(name):
-    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+# All groups, in display order (used by --all)
+GROUPS = [
+    "j1_winner",
+    "j1_east",
+    "j1_west",
+    "j2_3_winner",
+    "j2_3_east_a",
+    "j2_3_east_b",
+    "j2_3_west_a",
+    "j2_3_west_b",
+]
 
 
 def create_connection(db_file):
     conn = None
     try:
-        conn = sqlite3.connect(db_file)
+        conn = instrument.trace(sqlite3.connect(db_file))
     except sqlite3.Error as e:
         print(e)
     return conn
 
 
-def query_database(conn, column):
-    cur = conn.cursor()
-    cur.execute(
-        f'SELECT "{column}", COUNT(*) as count FROM jpred GROUP BY "{column}" ORDER BY count DESC'
-    )
-    return cur.fetchall()
+def _count_order(row):
+    """Sort key for (team, count): most-picked first, ties by team name with blanks (None) first."""
+    team, count = row
+    return -count, team is not None, team or ''
+
+
+def query_database(conn, group, slot):
+    """Return [(team, count), ...] for one prediction slot, in _count_order.
+
+    Participants who left the slot blank are counted under None.
+    """
+    rows = conn.execute(
+        'SELECT t.name, COUNT(*) FROM predictions p JOIN teams t USING (team_id) '
+        'WHERE p."group" = ? AND p.slot = ? GROUP BY p.team_id',
+        (group, slot)).fetchall()
+    users = conn.execute('SELECT COUNT(*) FROM users').fetchone()[0]
+    blank = users - sum(count for _, count in rows)
+    if blank:
+        rows.append((None, blank))
+    return sorted(rows, key=_count_order)
+
+
+def aggregate_columns(conn, group_columns):
+    """Count predictions for every (column, team) pair of every group.
+
+    group_columns maps group -> prediction columns, in cols/{group}.cols order.
+    Returns {column: [(team, count), ...]}, ordered like query_database.
+    """
+    return {
+        column: query_database(conn, group, slot)
+        for group, columns in group_columns.items()
+        for slot, column in enumerate(columns)
+    }
+
+
+def counts_from_index(index, columns):
+    """Return aggregate_columns output for columns, from a jpred_teams.team_index result."""
+    results = {column: [] for column in columns}
+    for team, picks in index.items():
+        for column, names in picks.items():
+            if column in results:
+                results[column].append((team, len(names)))
+    for rows in results.values():
+        rows.sort(key=_count_order)
+    return results
 
 
 def load_tsv_labels(path):
@@ -56,28 +115,16 @@ def load_tsv_labels(path):
     return labels
 
 
-@click.command()
-@click.argument('html_filename')
-@click.argument('columns_file')
-@click.option('--year', default=None, help='Season year (e.g. 2026). Auto-detects latest from tables/ if omitted.')
-def main(html_filename, columns_file, year):
-    if not year:
-        tables_dir = Path('tables')
-        year_dirs = [d for d in tables_dir.iterdir() if d.is_dir() and d.name.isdigit()]
-        if not year_dirs:
-            print("Error: No year directory found in tables/")
-            raise SystemExit(1)
-        year = max(d.name for d in year_dirs)
-
-    column_labels = load_tsv_labels('labels/column_labels.tsv')
+def build_group_page(conn, env, html_filename, columns, column_labels, year, manifest=None,
+                     counts=None):
+    """Render the aggregate page for one group and export its aggregated_data CSV.
 
-    db_path = f'jpred_{year}.db'
-    conn = create_connection(db_path)
-    if conn is None:
-        print('Error! Cannot connect to the database.')
-        raise SystemExit(1)
-
-    columns = [c for c in Path(columns_file).read_text().splitlines() if c.strip()]
+    The group is taken from the output filename (docs/j1_east.html -> j1_east).
+    With a manifest the page is only rewritten when its inputs changed.
+    columns are the group's cols file in order (a column's line is its slot).
+    counts, if given, is aggregate_columns output covering these columns;
+    otherwise each column is queried separately.
+    """
     division = Path(html_filename).stem  # e.g. "j1_east"
 
     # Try to get team ordering from the league table (may not exist for winner groups)
@@ -91,16 +138,14 @@ def main(html_filename, columns_file, year):
     data = {}
     csv_data = {team: {} for team in all_teams}
 
-    for column in columns:
-        results = query_database(conn, column)
+    for slot, column in enumerate(columns):
+        results = counts[column] if counts is not None else query_database(conn, division, slot)
         label = column_labels.get(column, column)
         data[label] = results
         for team, count in results:
             if team in csv_data:
                 csv_data[team][label] = count
 
-    conn.close()
-
     if all_teams:
         aggregated_dir = Path('aggregated_data')
         aggregated_dir.mkdir(exist_ok=True)
@@ -110,16 +155,74 @@ def main(html_filename, columns_file, year):
         df = df.fillna(0).astype(int)
         df = df.reindex(all_teams)
         df.to_csv(csv_filename)
+        instrument.record_write(csv_filename)
         print(f'CSV file {csv_filename} has been created.')
 
-    env = Environment(loader=FileSystemLoader('.'))
-    env.filters['team_id'] = team_id
-    template = env.get_template('templates/template.html')
-    html_content = template.render(data=data, year=year)
+    data = {label: [tuple(row) for row in results] for label, results in data.items()}
+    if write_page(env, 'templates/template.html', html_filename, manifest, data=data, year=year):
+        print(f'HTML file {html_filename} has been created.')
+
+
+@instrument.stage('group pages')
+def build_all_group_pages(conn, env, group_columns, column_labels, year, manifest=None, index=None):
+    """Write docs/{group}.html and aggregated_data/{group}.csv for every group.
+
+    group_columns maps group -> prediction columns. The counts come from
+    aggregate_columns, or from index (a jpred_teams.team_index result) if given.
+    """
+    with instrument.stage('aggregate'):
+        if index is None:
+            counts = aggregate_columns(conn, group_columns)
+        else:
+            all_columns = [col for columns in group_columns.values() for col in columns]
+            counts = counts_from_index(index, all_columns)
+    for group, columns in group_columns.items():
+        build_group_page(conn, env, f'docs/{group}.html', columns, column_labels, year,
+                         manifest, counts)
+
+
+@click.command()
+@click.argument('html_filename', required=False)
+@click.argument('columns_file', required=False)
+@click.option('--year', default=None, help='Season year (e.g. 2026). Auto-detects latest from tables/ if omitted.')
+@click.option('--full', is_flag=True, help='Rewrite the page even if its inputs are unchanged.')
+@click.option('--all', 'all_groups', is_flag=True,
+              help='Write every group page and CSV from one set of aggregate counts.')
+@click.option('--profile', is_flag=True, help='Write cProfile stats and a Chrome trace to profile/.')
+def main(html_filename, columns_file, year, full, all_groups, profile):
+    if not all_groups and not (html_filename and columns_file):
+        raise click.UsageError('Give HTML_FILENAME and COLUMNS_FILE, or use --all.')
+    if not year:
+        tables_dir = Path('tables')
+        year_dirs = [d for d in tables_dir.iterdir() if d.is_dir() and d.name.isdigit()]
+        if not year_dirs:
+            print("Error: No year directory found in tables/")
+            raise SystemExit(1)
+        year = max(d.name for d in year_dirs)
+
+    with instrument.run('jpred', profile):
+        column_labels = load_tsv_labels('labels/column_labels.tsv')
+
+        db_path = f'jpred_{year}.db'
+        conn = create_connection(db_path)
+        if conn is None:
+            print('Error! Cannot connect to the database.')
+            raise SystemExit(1)
 
-    with open(html_filename, 'w') as html_file:
-        html_file.write(html_content)
-    print(f'HTML file {html_filename} has been created.')
+        env = get_environment()
+        manifest = BuildManifest(full=full)
+
+        if all_groups:
+            group_columns = {
+                group: [c for c in Path(f'cols/{group}.cols').read_text().splitlines() if c.strip()]
+                for group in GROUPS
+            }
+            build_all_group_pages(conn, env, group_columns, column_labels, year, manifest)
+        else:
+            columns = [c for c in Path(columns_file).read_text().splitlines() if c.strip()]
+            build_group_page(conn, env, html_filename, columns, column_labels, year, manifest)
+        conn.close()
+        manifest.save()
 
 
 if __name__ == '__main__':
@@ -11,26 +11,35 @@ Generate an A-Z team report showing who picked each team and for what prediction
 
 For every team that appears in any prediction column, lists the participants who
 selected that team along with the position they predicted. Teams with no predictions
-are also listed. Output: docs/teams.html
+are also listed.
+
+The page is built from an inverted index, team -> {column -> [participants]},
+made from the predictions table written by import.py (team_index): one query
+per prediction slot, each answered from the ("group", slot, team_id) index in
+team order. build.py builds it once and passes it to both the group pages
+(jpred.counts_from_index) and this page. Teams nobody picked come from one
+UNION query over the league tables.
+
+Output: docs/teams.html, plus docs/search-teams.json, the team half of the
+search index read by search.js (see search_index.py).
 
 Usage:
-    jpred_teams.py [--year YEAR]
+    jpred_teams.py [--year YEAR] [--profile]
 """
-import re
 import click
 import sqlite3
 from collections import defaultdict
 from datetime import datetime
-from jinja2 import Environment, FileSystemLoader
 from pathlib import Path
-
-
-def team_id(name):
-    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+import instrument
+from manifest import BuildManifest, write_page
+from rendering import get_environment, team_id
+from search_index import write_search_index
+from team_registry import load_registry
 
 
 def create_connection(db_file):
-    conn = sqlite3.connect(db_file)
+    conn = instrument.trace(sqlite3.connect(db_file))
     conn.row_factory = sqlite3.Row
     return conn
 
@@ -61,9 +70,99 @@ GROUPS = [
 ]
 
 
+def team_index(conn, group_columns):
+    """Invert the predictions table into {team: {column: [name, ...]}}.
+
+    group_columns maps group -> prediction columns, in cols/{group}.cols order
+    (a column's line is its slot). Columns are in that order and names in
+    table order. Columns missing from the jpred table are skipped. Participants
+    who left a column blank are listed under None, so per-column counts can be
+    taken from the index too.
+    """
+    existing = {row[1] for row in conn.execute('PRAGMA table_info(jpred)')}
+    cursor = conn.cursor()
+    cursor.row_factory = None  # plain tuples; much cheaper than sqlite3.Row here
+    users = cursor.execute('SELECT user_id, name FROM users ORDER BY user_id').fetchall()
+    if not users:
+        return {}
+    names = dict(users)
+
+    index = {}
+    for group, cols in group_columns.items():
+        for slot, col in enumerate(cols):
+            if col not in existing:
+                continue
+            rows = cursor.execute(
+                'SELECT t.name, p.user_id FROM predictions p JOIN teams t USING (team_id) '
+                'WHERE p."group" = ? AND p.slot = ? ORDER BY p.team_id, p.user_id',
+                (group, slot))
+            by_team = defaultdict(list)
+            picked = set()
+            for team, user_id in rows:
+                by_team[team].append(names[user_id])
+                picked.add(user_id)
+            if len(picked) < len(users):
+                by_team[None] = [name for user_id, name in users if user_id not in picked]
+            for team, pickers in by_team.items():
+                index.setdefault(team, {})[col] = pickers
+    return index
+
+
+def league_teams(conn, year):
+    """Return every team in the year's league tables, with one query."""
+    tables = [f"{group}_{year}" for group in GROUPS]
+    existing = [name for (name,) in conn.execute(
+        f"SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ({', '.join('?' * len(tables))})",
+        tables)]
+    if not existing:
+        return set()
+    query = ' UNION '.join(f'SELECT Team FROM "{table}"' for table in existing)
+    return {team for (team,) in conn.execute(query)}
+
+
+@instrument.stage('teams page')
+def build_teams_page(conn, env, group_columns, column_labels, year, manifest=None, index=None):
+    """Render docs/teams.html and docs/search-teams.json from the predictions and league tables.
+
+    With a manifest the page is only rewritten when its inputs changed. index
+    is a team_index() result to reuse; without one it is built here.
+    """
+    if index is None:
+        with instrument.stage('team index'):
+            index = team_index(conn, group_columns)
+
+    # Teams nobody picked are listed too; blank picks are not teams
+    all_teams_seen = {team for team in index if team} | league_teams(conn, year)
+
+    # Sort teams A-Z; predictions sharing a label are merged in column order
+    teams = []
+    for team in sorted(all_teams_seen, key=str.casefold):
+        pickers = {}
+        for col, names in index.get(team, {}).items():
+            pickers.setdefault(column_labels.get(col, col), []).extend(names)
+        teams.append({"name": team, "pickers": pickers})
+
+    rendered_at = datetime.now().strftime("%Y-%m-%d %H:%M")
+    out = 'docs/teams.html'
+    if write_page(env, 'templates/teams.html', out, manifest,
+                  teams=teams, year=year, rendered_at=rendered_at):
+        print(f"Written {out} ({len(teams)} teams)")
+
+    # Teams are also found (and noted) by their name in the standings
+    registry = load_registry()
+    ids = [registry.find(team["name"]) for team in teams]
+    local = [registry.names[i] if i is not None else '' for i in ids]
+    entries = [[team["name"], name, team_id(team["name"])] for team, name in zip(teams, local)]
+    texts = [[team["name"], name] for team, name in zip(teams, local)]
+    if write_search_index('docs/search-teams.json', 'teams.html#{}', '{}', entries, texts, manifest):
+        print(f"Written docs/search-teams.json ({len(entries)} teams)")
+
+
 @click.command()
 @click.option('--year', default=None, help='Season year (e.g. 2026). Auto-detects latest from tables/ if omitted.')
-def main(year):
+@click.option('--full', is_flag=True, help='Rewrite the page even if its inputs are unchanged.')
+@click.option('--profile', is_flag=True, help='Write cProfile stats and a Chrome trace to profile/.')
+def main(year, full, profile):
     if not year:
         tables_dir = Path('tables')
         year_dirs = [d for d in tables_dir.iterdir() if d.is_dir() and d.name.isdigit()]
@@ -72,63 +171,21 @@ def main(year):
             raise SystemExit(1)
         year = max(d.name for d in year_dirs)
 
-    column_labels = load_tsv_labels('labels/column_labels.tsv')
-
-    # Collect all prediction columns from all group cols files
-    all_cols = []
-    for group in GROUPS:
-        cols_file = Path(f'cols/{group}.cols')
-        if cols_file.exists():
-            all_cols.extend(load_cols(cols_file))
-
-    conn = create_connection(f'jpred_{year}.db')
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM jpred")
-    rows = cursor.fetchall()
-
-    # Build: team -> {prediction_label -> [name, ...]}  (insertion order preserved)
-    team_pickers = defaultdict(dict)
-    all_teams_seen = set()
-
-    for col in all_cols:
-        label = column_labels.get(col, col)
-        for row in rows:
-            if col not in row.keys():
-                continue
-            team = row[col]
-            if not team:
-                continue
-            name = row["Name"]
-            all_teams_seen.add(team)
-            team_pickers[team].setdefault(label, []).append(name)
-
-    # Also include all teams from league tables so teams with no predictions appear
-    for group in GROUPS:
-        table_name = f"{group}_{year}"
-        try:
-            cursor.execute(f'SELECT Team FROM "{table_name}" ORDER BY Team')
-            for (team,) in cursor.fetchall():
-                all_teams_seen.add(team)
-        except sqlite3.OperationalError:
-            pass
-
-    conn.close()
-
-    # Sort teams A-Z, build ordered list
-    teams = []
-    for team in sorted(all_teams_seen, key=str.casefold):
-        pickers = team_pickers.get(team, {})
-        teams.append({"name": team, "pickers": pickers})
-
-    rendered_at = datetime.now().strftime("%Y-%m-%d %H:%M")
-    env = Environment(loader=FileSystemLoader('.'))
-    env.filters['team_id'] = team_id
-    template = env.get_template('templates/teams.html')
-    html = template.render(teams=teams, year=year, rendered_at=rendered_at)
-
-    out = Path('docs/teams.html')
-    out.write_text(html)
-    print(f"Written {out} ({len(teams)} teams)")
+    with instrument.run('jpred_teams', profile):
+        column_labels = load_tsv_labels('labels/column_labels.tsv')
+
+        # Prediction columns of every group, from the cols files
+        group_columns = {
+            group: load_cols(f'cols/{group}.cols')
+            for group in GROUPS if Path(f'cols/{group}.cols').exists()
+        }
+
+        conn = create_connection(f'jpred_{year}.db')
+        env = get_environment()
+        manifest = BuildManifest(full=full)
+        build_teams_page(conn, env, group_columns, column_labels, year, manifest)
+        conn.close()
+        manifest.save()
 
 
 if __name__ == '__main__':
@@ -4,6 +4,7 @@
 # dependencies = [
 #     "click",
 #     "jinja2",
+#     "pandas",
 # ]
 # ///
 """
@@ -17,39 +18,50 @@ Scoring (per prediction):
 Winner predictions (j1_winner, j2_3_winner) are playoff-determined and
 shown without scoring until the playoff results are available.
 
+All participants are scored up front by scoring.score_all; each page is then
+rendered from its precomputed rows. With --jobs N the per-user pages are
+rendered by N worker processes; the output is identical to the serial path.
+
+The leaderboard is split into pages of LEADERBOARD_PAGE_SIZE rows
+(docs/users.html, docs/users-2.html, ...), each written through the build
+manifest, so a rank change only rewrites the pages whose rows moved.
+docs/index.html shows the first page. docs/users.json maps every participant
+to [page, rank], and docs/search-users.json is the participant half of the
+search index read by search.js (see search_index.py).
+
 Usage:
-    jpred_users.py [--year YEAR]
+    jpred_users.py [--year YEAR] [--jobs N] [--profile]
 """
-import re
 import click
 import sys
 import sqlite3
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from jinja2 import Environment, FileSystemLoader
+from functools import partial
 from pathlib import Path
+import instrument
+from manifest import BuildManifest, write_json, write_page
+from rendering import get_environment
+from search_index import write_search_index
+from bounds import score_bounds
+from scoring import pick_names, rank_movement, score_all, write_snapshot
 
 
-def team_id(name):
-    """Convert a team name to a URL-safe anchor ID."""
-    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+# Rows per leaderboard page (docs/users.html, docs/users-2.html, ...)
+LEADERBOARD_PAGE_SIZE = 500
 
 
 def create_connection(db_file):
     conn = None
     try:
-        conn = sqlite3.connect(db_file)
+        conn = instrument.trace(sqlite3.connect(db_file))
         conn.row_factory = sqlite3.Row
     except sqlite3.Error as e:
         print(e)
     return conn
 
 
-def get_all_users(conn):
-    cursor = conn.cursor()
-    cursor.execute("SELECT Name FROM jpred")
-    return [row["Name"] for row in cursor.fetchall()]
-
-
 def _load_cols(path):
     return [line.strip() for line in Path(path).read_text().splitlines() if line.strip()]
 
@@ -77,191 +89,162 @@ league_predictions = {
     "j2_3_west_b": _load_cols("cols/j2_3_west_b.cols"),
 }
 
-# Scoring config per group:
-#   table    - DB table key (combined with year: "{table}_{year}")
-#   positions - expected position for each prediction in the group
-#   zones     - (low, high) bonus zone for each prediction
-#               a point is awarded if the actual position falls in this range
-GROUP_SCORING = {
-    "j1_east": {
-        "table":     "j1_east",
-        "positions": [1, 2, 3, 8, 9, 10],
-        "zones":     [(1, 3), (1, 3), (1, 3), (8, 10), (8, 10), (8, 10)],
-    },
-    "j1_west": {
-        "table":     "j1_west",
-        "positions": [1, 2, 3, 8, 9, 10],
-        "zones":     [(1, 3), (1, 3), (1, 3), (8, 10), (8, 10), (8, 10)],
-    },
-    "j2_3_east_a": {
-        "table":     "j2_3_east_a",
-        "positions": [1, 10],
-        "zones":     [(1, 3), (8, 10)],
-    },
-    "j2_3_east_b": {
-        "table":     "j2_3_east_b",
-        "positions": [1, 10],
-        "zones":     [(1, 3), (8, 10)],
-    },
-    "j2_3_west_a": {
-        "table":     "j2_3_west_a",
-        "positions": [1, 10],
-        "zones":     [(1, 3), (8, 10)],
-    },
-    "j2_3_west_b": {
-        "table":     "j2_3_west_b",
-        "positions": [1, 10],
-        "zones":     [(1, 3), (8, 10)],
-    },
-    # winner predictions are playoff-determined: no table to look up yet
-    "j1_winner":   None,
-    "j2_3_winner": None,
-}
-
-
-def get_team_position(conn, table_name, team_name):
-    """Return a team's position from the league table, or None if not found."""
-    try:
-        cursor = conn.cursor()
-        cursor.execute(f'SELECT Position FROM "{table_name}" WHERE Team = ?', (team_name,))
-        row = cursor.fetchone()
-        return row[0] if row else None
-    except sqlite3.OperationalError:
-        return None
-
+def write_one_user(name, html_filename, env, year, picks, positions, points, totals,
+                   rendered_at, manifest=None):
+    """Render one participant's page from their precomputed scoring rows.
 
-def score_prediction(actual_pos, expected_pos, zone):
-    """Return points for one prediction: 2 for exact match + 1 for correct zone.
-
-    Only call when actual_pos is not None.
+    picks, positions and points are dicts keyed by prediction column and totals
+    is the participant's row from score_all's totals frame. With a manifest the
+    page is only rewritten when its inputs changed.
     """
-    low, high = zone
-    points = 0
-    if actual_pos == expected_pos:
-        points += 2
-    if low <= actual_pos <= high:
-        points += 1
-    return points
-
-
-def write_one_user(conn, name, html_filename, env, year="2026"):
-    template = env.get_template('templates/user_template.html')
-
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM jpred WHERE Name = ?", (name,))
-    row = cursor.fetchone()
-    if row is None:
-        print(f"No data for {name}, skipping.")
-        return
-
     predictions = {}
-    total_score = 0
-    j1_exact = 0
-    j2j3_exact = 0
-    j1_score = 0
-    j2j3_score = 0
-    has_any_score = False
-
-    J1_GROUPS    = {"j1_east", "j1_west"}
-    J2J3_GROUPS  = {"j2_3_east_a", "j2_3_east_b", "j2_3_west_a", "j2_3_west_b"}
-
     for group, cols in league_predictions.items():
         if not cols:
             continue
 
-        scoring = GROUP_SCORING.get(group)
         group_preds = []
-
-        for i, col in enumerate(cols):
-            team = row[col] if col in row.keys() else ""
-            position = "-"
-            score = "-"
-
-            if scoring and team:
-                table_name = f"{scoring['table']}_{year}"
-                actual_pos = get_team_position(conn, table_name, team)
-                if actual_pos is not None:
-                    position = actual_pos
-                    pts = score_prediction(actual_pos, scoring["positions"][i], scoring["zones"][i])
-                    score = pts
-                    total_score += pts
-                    has_any_score = True
-                    if group in J1_GROUPS:
-                        j1_score += pts
-                        if pts >= 2:
-                            j1_exact += 1
-                    elif group in J2J3_GROUPS:
-                        j2j3_score += pts
-                        if pts >= 2:
-                            j2j3_exact += 1
-
+        for col in cols:
+            position = positions.get(col, pd.NA)
+            score = points.get(col, pd.NA)
             group_preds.append({
                 "Prediction": column_labels.get(col, col),
-                "Team":       team,
-                "Position":   position,
-                "Score":      score,
+                "Team":       picks.get(col, ""),
+                "Position":   "-" if pd.isna(position) else position,
+                "Score":      "-" if pd.isna(score) else score,
             })
 
         predictions[group] = group_preds
 
-    rendered_at = datetime.now().strftime("%Y-%m-%d %H:%M")
-    display_total = total_score if has_any_score else "-"
-    with open(html_filename, "w") as html_file:
-        html_content = template.render(
-            predictions=predictions,
-            name=name,
-            total_score=display_total,
-            year=year,
-            group_labels=group_labels,
-            rendered_at=rendered_at,
-        )
-        html_file.write(html_content)
-    print(f"Written {html_filename}")
+    has_any_score = bool(totals["has_score"])
+    display_total = int(totals["total"]) if has_any_score else "-"
+    written = write_page(
+        env, 'templates/user_template.html', html_filename, manifest,
+        predictions=predictions,
+        name=name,
+        total_score=display_total,
+        year=year,
+        group_labels=group_labels,
+        rendered_at=rendered_at,
+    )
+    if written:
+        print(f"Written {html_filename}")
     if not has_any_score:
         return None
     return {
-        "total":       total_score,
-        "j1_exact":    j1_exact,
-        "j2j3_exact":  j2j3_exact,
-        "total_exact": j1_exact + j2j3_exact,
-        "j1":          j1_score,
-        "j2j3":        j2j3_score,
+        "total":       int(totals["total"]),
+        "j1_exact":    int(totals["j1_exact"]),
+        "j2j3_exact":  int(totals["j2j3_exact"]),
+        "total_exact": int(totals["total_exact"]),
+        "j1":          int(totals["j1"]),
+        "j2j3":        int(totals["j2j3"]),
     }
 
 
-@click.command()
-@click.option('--year', default=None, help='Year to generate (e.g. 2026). Auto-detects from tables/ if omitted.')
-def main(year):
-    if not year:
-        tables_dir = Path('tables')
-        if tables_dir.exists():
-            year_dirs = [d for d in tables_dir.iterdir() if d.is_dir() and d.name.isdigit()]
-            year = year_dirs[0].name if year_dirs else None
-        if not year:
-            print("Error: could not detect year. Use --year.")
-            sys.exit(1)
+# Per-process state for --jobs workers, set up once by _init_render_worker
+_worker = {}
+
 
-    db_path = f'jpred_{year}.db'
+def _init_render_worker(manifest_path, full):
+    """Give each worker its own Environment, loaded from the bytecode cache."""
+    _worker['env'] = get_environment()
+    _worker['manifest'] = BuildManifest(manifest_path, full) if manifest_path else None
+
+
+def _render_users(year, rendered_at, users):
+    """Worker task: render a chunk of users.
+
+    Returns ([(name, score, manifest key)], instrument counts for the chunk).
+    """
+    before = instrument.snapshot()
+    env = _worker['env']
+    manifest = _worker['manifest']
+    results = []
+    for name, picks, positions, points, totals in users:
+        html_filename = f"docs/preds/{name}.html"
+        score = write_one_user(name, html_filename, env, year,
+                               picks, positions, points, totals, rendered_at, manifest)
+        key = manifest.entries.get(html_filename) if manifest is not None else None
+        results.append((name, score, key))
+    return results, instrument.since(before)
+
+
+@instrument.stage('user pages')
+def build_user_pages(conn, env, year, manifest=None, jobs=1):
+    """Score every participant and write docs/preds/*.html, docs/users.html and docs/index.html.
+
+    Without a manifest every page is rewritten. With one, only pages whose
+    inputs changed are rewritten, and pages of participants who are no longer
+    in the jpred table are removed. jobs > 1 renders the per-user pages in a
+    pool of that many worker processes.
+
+    The scores are also appended to score_snapshots, and each participant's
+    rank movement since the previous snapshot is shown on the leaderboard,
+    with the range of points still possible and whether they can still
+    finish first (bounds.score_bounds).
+    """
     preds_dir = Path('docs/preds')
-    for f in preds_dir.glob('*.html'):
-        f.unlink()
+    if manifest is None:
+        for f in preds_dir.glob('*.html'):
+            f.unlink()
     preds_dir.mkdir(parents=True, exist_ok=True)
-    env = Environment(loader=FileSystemLoader('.'))
-    env.filters['team_id'] = team_id
 
-    conn = create_connection(db_path)
-    names = get_all_users(conn)
+    with instrument.stage('score'):
+        picks, positions, points, totals = score_all(conn, year, league_predictions)
+        write_snapshot(conn, year, picks, points, league_predictions)
+        movement = rank_movement(conn)
+    bounds = score_bounds(conn, year, league_predictions, picks).to_dict("index")
 
-    scores = {}
-    for name in names:
+    picks = pick_names(conn, picks).to_dict("index")
+    positions = positions.to_dict("index")
+    points = points.to_dict("index")
+    totals = totals.to_dict("index")
+
+    rendered_at = datetime.now().strftime("%Y-%m-%d %H:%M")
+
+    users = []
+    for name in picks:
         if '/' in name:
             print(f"Skipping {name} (contains /)")
             continue
-        html_filename = f"docs/preds/{name}.html"
-        score = write_one_user(conn, name, html_filename, env, year)
-        scores[name] = score
+        users.append((name, picks[name], positions[name], points[name], totals[name]))
 
-    conn.close()
+    scores = {}
+    if jobs > 1 and users:
+        # Contiguous chunks, gathered in order, so the leaderboard tie order
+        # matches the serial path
+        chunk_size = -(-len(users) // (jobs * 4))
+        chunks = [users[i:i + chunk_size] for i in range(0, len(users), chunk_size)]
+        initargs = (manifest.path, manifest.full) if manifest is not None else (None, False)
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_render_worker,
+                                 initargs=initargs) as pool:
+            for results, counts in pool.map(partial(_render_users, year, rendered_at), chunks):
+                instrument.add(counts)
+                for name, score, key in results:
+                    scores[name] = score
+                    if manifest is not None:
+                        manifest.record(f"docs/preds/{name}.html", key)
+    else:
+        for name, user_picks, user_positions, user_points, user_totals in users:
+            html_filename = f"docs/preds/{name}.html"
+            scores[name] = write_one_user(name, html_filename, env, year,
+                                          user_picks, user_positions, user_points, user_totals,
+                                          rendered_at, manifest)
+
+    if manifest is not None:
+        current = {f"docs/preds/{name}.html" for name in scores}
+        for f in preds_dir.glob('*.html'):
+            if str(f) not in current:
+                f.unlink()
+                manifest.forget(f)
+                print(f"Removed stale {f}")
+
+    for name, score in scores.items():
+        if score is not None and name in movement:
+            score["move"] = movement[name]
+        if score is not None and name in bounds:
+            score["min"] = bounds[name]["min_points"]
+            score["max"] = bounds[name]["max_points"]
+            score["eliminated"] = bounds[name]["eliminated"]
 
     # Sort: total desc, total_exact desc, j1_exact desc
     scored = sorted(
@@ -274,18 +257,87 @@ def main(year):
         [("-", n, {}) for n in unscored]
     )
 
-    rendered_at = datetime.now().strftime("%Y-%m-%d %H:%M")
-    leaderboard_data = dict(ordered_leaderboard=ordered_leaderboard, year=year, rendered_at=rendered_at)
+    write_leaderboard_pages(env, ordered_leaderboard, year, rendered_at, manifest)
+
+
+def leaderboard_page_url(page):
+    """Return the docs/-relative file name of a leaderboard page (1-based)."""
+    return 'users.html' if page == 1 else f'users-{page}.html'
+
+
+@instrument.stage('leaderboard pages')
+def write_leaderboard_pages(env, ordered_leaderboard, year, rendered_at, manifest=None,
+                            page_size=LEADERBOARD_PAGE_SIZE):
+    """Write the paginated leaderboard, docs/index.html, docs/users.json and the search index.
+
+    ordered_leaderboard is [(points, name, score), ...] in rank order. Each page
+    only gets its own slice of rows, so with a manifest a page is rewritten
+    only when one of its rows (or the number of pages) changed. Pages beyond
+    the last one from an earlier, larger build are removed.
+    """
+    pages = max(1, -(-len(ordered_leaderboard) // page_size))
+    index = {}
+    written = 0
+    for page in range(1, pages + 1):
+        start = (page - 1) * page_size
+        rows = ordered_leaderboard[start:start + page_size]
+        for rank, (_, name, _) in enumerate(rows, start + 1):
+            index[name] = [page, rank]
+        if write_page(env, 'templates/users.html', f'docs/{leaderboard_page_url(page)}', manifest,
+                      ordered_leaderboard=rows, first_rank=start + 1, page=page, pages=pages,
+                      prev_url=leaderboard_page_url(page - 1) if page > 1 else None,
+                      next_url=leaderboard_page_url(page + 1) if page < pages else None,
+                      last_url=leaderboard_page_url(pages),
+                      year=year, rendered_at=rendered_at):
+            written += 1
+    print(f"Written {written} of {pages} leaderboard page(s) (docs/users*.html)")
+
+    for f in Path('docs').glob('users-*.html'):
+        number = f.stem.split('-', 1)[1]
+        if not number.isdigit() or int(number) > pages:
+            f.unlink()
+            if manifest is not None:
+                manifest.forget(f)
+            print(f"Removed stale {f}")
+
+    if write_json('docs/users.json', {'page_size': page_size, 'pages': pages, 'users': index}, manifest):
+        print("Written docs/users.json")
+
+    entries = [[name, rank] for name, (_, rank) in index.items()]
+    if write_search_index('docs/search-users.json', 'preds/{}.html', 'Rank {}',
+                          entries, [[name] for name in index], manifest):
+        print(f"Written docs/search-users.json ({len(entries)} participants)")
+
+    if write_page(env, 'templates/index.html', 'docs/index.html', manifest,
+                  ordered_leaderboard=ordered_leaderboard[:page_size], pages=pages,
+                  year=year, rendered_at=rendered_at):
+        print("Written docs/index.html")
+
+
+@click.command()
+@click.option('--year', default=None, help='Year to generate (e.g. 2026). Auto-detects from tables/ if omitted.')
+@click.option('--full', is_flag=True, help='Rewrite every page, even if its inputs are unchanged.')
+@click.option('--jobs', '-j', default=1, show_default=True, help='Worker processes for rendering user pages.')
+@click.option('--profile', is_flag=True, help='Write cProfile stats and a Chrome trace to profile/.')
+def main(year, full, jobs, profile):
+    if not year:
+        tables_dir = Path('tables')
+        if tables_dir.exists():
+            year_dirs = [d for d in tables_dir.iterdir() if d.is_dir() and d.name.isdigit()]
+            year = year_dirs[0].name if year_dirs else None
+        if not year:
+            print("Error: could not detect year. Use --year.")
+            sys.exit(1)
 
-    template = env.get_template('templates/users.html')
-    with open('docs/users.html', 'w') as f:
-        f.write(template.render(**leaderboard_data))
-    print("Written docs/users.html")
+    with instrument.run('jpred_users', profile):
+        db_path = f'jpred_{year}.db'
+        env = get_environment()
 
-    template = env.get_template('templates/index.html')
-    with open('docs/index.html', 'w') as f:
-        f.write(template.render(**leaderboard_data))
-    print("Written docs/index.html")
+        manifest = BuildManifest(full=full)
+        conn = create_connection(db_path)
+        build_user_pages(conn, env, year, manifest, jobs)
+        conn.close()
+        manifest.save()
 
 
 if __name__ == '__main__':
@@ -13,8 +13,13 @@ Supports both the 2026 regional format (j1_east, j1_west, j2_3_east_a, etc.)
 and the legacy format (j1, j2, j3). Auto-detects which format is present based
 on which JSON files exist in the year directory.
 
-Japanese club names from the scraper are translated to English using
-jp_name_mapping.csv so that league table Team names match prediction names.
+Club names from the scraper are resolved against the team registry
+(labels/team_registry.tsv, see team_registry.py): TeamId holds the registry's
+integer ID, the join key, and Team the club's English name, as shown on the
+site and stored in the imported predictions. A club the registry does not
+know is reported and imported under its name as scraped, with no TeamId, so
+one new spelling on the live site does not stop the import (or watch.py);
+add it to the registry's Aliases to have it scored.
 
 Usage:
     json_to_db.py [YEAR]
@@ -29,6 +34,9 @@ import sys
 import click
 from pathlib import Path
 
+import instrument
+import team_registry
+
 # 2026 regional competition groups
 NEW_FORMAT_LEAGUES = [
     "j1_east", "j1_west",
@@ -40,39 +48,33 @@ NEW_FORMAT_LEAGUES = [
 OLD_FORMAT_LEAGUES = ["j1", "j2", "j3"]
 
 
-def load_jp_mapping(csv_path):
-    """Load Japanese→English team name mapping from jp_name_mapping.csv."""
-    p = Path(csv_path)
-    if not p.exists():
-        return {}
-    df = pd.read_csv(p)
-    return dict(zip(df['Japanese'], df['English']))
-
+def json_to_db(json_path, db_path, table_name, registry=None):
+    """Import a single JSON standings file into an SQLite table.
 
-def json_to_db(json_path, db_path, table_name, jp_mapping):
-    """Import a single JSON standings file into an SQLite table."""
+    A club not in the team registry keeps its scraped name and a NULL TeamId.
+    """
     with open(json_path, encoding='utf-8') as f:
         data = json.load(f)
 
-    records = []
-    for entry in data:
-        japanese_name = entry['Club']
-        english_name = jp_mapping.get(japanese_name, japanese_name)
-        records.append({
-            'Team':     english_name,
-            'Position': entry['Position'],
-        })
-
-    df = pd.DataFrame(records)
-    conn = sqlite3.connect(db_path)
-    df.to_sql(table_name, conn, if_exists='replace', index=False)
-    conn.close()
-    print(f"Imported {len(records)} teams from {json_path} into {table_name}")
+    registry = registry or team_registry.load_registry()
+    clubs = pd.Series([entry['Club'] for entry in data], dtype=object)
+    ids = registry.ids(clubs)  # reports any unknown club
+    df = pd.DataFrame({
+        'TeamId':   ids,
+        'Team':     registry.canonical_names(clubs),
+        'Position': [entry['Position'] for entry in data],
+    })
+    with instrument.stage(f'standings {table_name}'):
+        conn = instrument.trace(sqlite3.connect(db_path))
+        df.to_sql(table_name, conn, if_exists='replace', index=False)
+        conn.close()
+    print(f"Imported {len(df)} teams from {json_path} into {table_name}")
 
 
 @click.command()
 @click.argument('year', required=False)
-def main(year):
+@click.option('--profile', is_flag=True, help='Write cProfile stats and a Chrome trace to profile/.')
+def main(year, profile):
     """Convert JSON league standings to SQLite database.
 
     YEAR: Season year (e.g. 2026). Auto-detects from tables/ if omitted.
@@ -87,7 +89,6 @@ def main(year):
 
     year_path = Path('tables') / year
     db_path = f'jpred_{year}.db'
-    jp_mapping = load_jp_mapping('jp_name_mapping.csv')
 
     # Detect format from which JSON files exist
     new_files = [year_path / f"{league}.json" for league in NEW_FORMAT_LEAGUES]
@@ -98,12 +99,13 @@ def main(year):
     else:
         leagues = OLD_FORMAT_LEAGUES
 
-    for league in leagues:
-        json_file = year_path / f"{league}.json"
-        if json_file.exists():
-            json_to_db(json_file, db_path, f"{league}_{year}", jp_mapping)
-        else:
-            print(f"Skipping {json_file} (not found)")
+    with instrument.run('json_to_db', profile):
+        for league in leagues:
+            json_file = year_path / f"{league}.json"
+            if not json_file.exists():
+                print(f"Skipping {json_file} (not found)")
+                continue
+            json_to_db(json_file, db_path, f"{league}_{year}")
 
     print(f"\nDatabase {db_path} updated.")
 
@@ -11,19 +11,7 @@ echo "Using year: $YEAR"
 
 mkdir -p docs
 mkdir -p docs/preds
-rm -f jpred_${YEAR}.db
-rm -f docs/j*.html
-rm -f docs/users.html
-rm -f docs/preds/*.html
-rm -f docs/leaderboard.png
-./create_db.sh
-for GROUP in j1_winner j1_east j1_west j2_3_winner j2_3_east_a j2_3_east_b j2_3_west_a j2_3_west_b; do
-    ./jpred.py "docs/${GROUP}.html" "cols/${GROUP}.cols"
-done
-./jpred_users.py
-./generate_leaderboard_image.py
-cp assets/favicons/*.png docs/ 2>/dev/null || true
-cp assets/favicons/*.ico docs/ 2>/dev/null || true
-cp assets/favicons/site.webmanifest docs/ 2>/dev/null || true
+# Pages are rebuilt incrementally (see manifest.py); pass --full to build.py to rewrite all.
+# Import, stats pages, teams, preds, leaderboard image and assets in one process
+./build.py --year "$YEAR" --image
 cp index.html docs/ 2>/dev/null || true
-cp style.css docs/ 2>/dev/null || true
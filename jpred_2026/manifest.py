@@ -0,0 +1,135 @@
+"""
+Content-addressed build manifest for incremental rebuilds.
+
+For every generated page the manifest records a hash of everything the page
+was rendered from: the template source and the template context (participant
+row, the standings positions it references, labels, scores). On the next build
+a page whose inputs hash to the same value is neither re-rendered nor
+rewritten, so its mtime is unchanged and rsync in deploy_local.sh skips it.
+
+rendered_at is left out of the hash: an unchanged page keeps the timestamp of
+the build that last changed it.
+
+Pages are streamed to disk (Template.stream) through a buffered file rather
+than rendered into one string, so memory does not grow with the page. Each page
+is written to a hidden temporary file beside it and renamed into place, so
+rsync never picks up a half-written page.
+
+The manifest lives outside docs/ so it is never deployed.
+"""
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+import instrument
+
+MANIFEST_PATH = Path('.build_manifest.json')
+
+# File buffer for streamed pages, and template chunks joined per write
+WRITE_BUFFER = 1 << 16
+STREAM_CHUNKS = 64
+
+_template_digests = {}
+
+
+def digest(*parts):
+    """Return a stable SHA-256 hex digest of JSON-serialisable parts."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def template_digest(env, template_name):
+    """Return the digest of a template's source, read once per process."""
+    if template_name not in _template_digests:
+        source, _, _ = env.loader.get_source(env, template_name)
+        _template_digests[template_name] = digest(source)
+    return _template_digests[template_name]
+
+
+class BuildManifest:
+    """Map of output path -> input digest, loaded from and saved to MANIFEST_PATH.
+
+    With full=True every page is treated as stale (a forced full rebuild), but
+    the new digests are still recorded for the next incremental run.
+    """
+
+    def __init__(self, path=MANIFEST_PATH, full=False):
+        self.path = Path(path)
+        self.full = full
+        self.entries = {}
+        if self.path.exists():
+            try:
+                self.entries = json.loads(self.path.read_text())
+            except json.JSONDecodeError:
+                print(f"Warning: ignoring unreadable manifest {self.path}")
+
+    def is_current(self, output, key):
+        """True if output exists and was last built from inputs with this key."""
+        if self.full:
+            return False
+        return self.entries.get(str(output)) == key and Path(output).exists()
+
+    def record(self, output, key):
+        self.entries[str(output)] = key
+
+    def forget(self, output):
+        self.entries.pop(str(output), None)
+
+    def save(self):
+        self.path.write_text(json.dumps(self.entries, indent=0, sort_keys=True))
+
+
+@contextmanager
+def atomic_output(path):
+    """Yield a temporary path beside path; rename it over path if the block succeeds."""
+    path = Path(path)
+    tmp = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def write_page(env, template_name, output, manifest=None, **context):
+    """Render template_name with context to output, skipping unchanged pages.
+
+    Without a manifest the page is always written. Returns True if the page was
+    (re)written, False if the manifest showed its inputs were unchanged.
+    """
+    key = None
+    if manifest is not None:
+        inputs = {k: v for k, v in context.items() if k != 'rendered_at'}
+        key = digest(template_digest(env, template_name), inputs)
+        if manifest.is_current(output, key):
+            return False
+
+    template = env.get_template(template_name)
+    stream = template.stream(**context)
+    stream.enable_buffering(STREAM_CHUNKS)
+    with atomic_output(output) as tmp, open(tmp, 'w', buffering=WRITE_BUFFER) as f:
+        stream.dump(f)
+    instrument.record_write(output, page=True)
+
+    if manifest is not None:
+        manifest.record(output, key)
+    return True
+
+
+def write_json(output, data, manifest=None):
+    """Write data to output as compact JSON, skipping it if unchanged (like write_page)."""
+    key = None
+    if manifest is not None:
+        key = digest(data)
+        if manifest.is_current(output, key):
+            return False
+
+    with atomic_output(output) as tmp, open(tmp, 'w', encoding='utf-8', buffering=WRITE_BUFFER) as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    instrument.record_write(output)
+
+    if manifest is not None:
+        manifest.record(output, key)
+    return True
@@ -0,0 +1,63 @@
+"""
+Shared Jinja environment for the page generators.
+
+jpred.py, jpred_teams.py, jpred_users.py and build.py all render through
+get_environment(), which builds one Environment per process:
+
+  - templates are looked up relative to the project root ('templates/x.html',
+    the names manifest.py hashes), with auto_reload off since templates do not
+    change during a build, so get_template() is a dict lookup
+  - compiled template bytecode is cached on disk in .jinja_cache/, so later
+    runs (and every --jobs worker) load templates without recompiling them
+  - every templates/*.html is compiled up front, keeping compile time out of
+    the per-page loop
+  - the team_id filter is memoized; there are only a few dozen team names
+"""
+import hashlib
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+from team_registry import load_registry
+
+TEMPLATE_DIR = Path('templates')
+BYTECODE_CACHE_DIR = Path('.jinja_cache')
+
+
+@lru_cache(maxsize=None)
+def team_id(name):
+    """Convert a team name to a URL-safe anchor ID.
+
+    A registry club gets the slug of its English name whichever spelling is
+    passed, so teams.html, the links to it and the search index agree. A name
+    that slugs to nothing (an unregistered Japanese spelling) gets "team-" and
+    a short hash of the name instead of an empty ID.
+    """
+    registry = load_registry()
+    known = registry.find(name)
+    if known is not None:
+        name = registry.display_name(known)
+    slug = re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+    return slug or 'team-' + hashlib.sha1(name.encode('utf-8')).hexdigest()[:8]
+
+
+def create_environment():
+    """Return a new Environment with the bytecode cache, filters and every template compiled."""
+    BYTECODE_CACHE_DIR.mkdir(exist_ok=True)
+    env = Environment(
+        loader=FileSystemLoader('.'),
+        bytecode_cache=FileSystemBytecodeCache(str(BYTECODE_CACHE_DIR)),
+        auto_reload=False,
+    )
+    env.filters['team_id'] = team_id
+    for template in sorted(TEMPLATE_DIR.glob('*.html')):
+        env.get_template(template.as_posix())
+    return env
+
+
+@lru_cache(maxsize=None)
+def get_environment():
+    """Return this process's shared Environment, creating it on first use."""
+    return create_environment()
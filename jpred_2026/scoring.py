@@ -0,0 +1,358 @@
+"""
+Batched scoring engine for JPred 2026.
+
+Loads every {group}_{year} standings table and every participant's picks once
+(from the predictions table written by import.py, one indexed query per
+prediction slot), then scores all participants column by column with pandas
+instead of looking up one prediction cell at a time. Picks and standings are
+matched on the registry's integer TeamId (see team_registry.py); names are only
+looked up for display.
+
+Scoring (per prediction):
+  - 2 points for exact position match
+  - 1 point for being in the correct zone (top 3 or bottom 3 of each group)
+  Maximum 3 points per prediction.
+
+Every scoring run also appends its per-group results to the score_snapshots
+table, keyed by a hash of the standings and of everyone's picks, so
+leaderboards, rank movement and the leaderboard image can read precomputed rows
+and earlier matchdays are kept.
+"""
+import hashlib
+import json
+import sqlite3
+import pandas as pd
+from datetime import datetime
+from pathlib import Path
+
+import team_registry
+
+# Scoring config per group:
+#   table    - DB table key (combined with year: "{table}_{year}")
+#   positions - expected position for each prediction in the group
+#   zones     - (low, high) bonus zone for each prediction
+#               a point is awarded if the actual position falls in this range
+GROUP_SCORING = {
+    "j1_east": {
+        "table":     "j1_east",
+        "positions": [1, 2, 3, 8, 9, 10],
+        "zones":     [(1, 3), (1, 3), (1, 3), (8, 10), (8, 10), (8, 10)],
+    },
+    "j1_west": {
+        "table":     "j1_west",
+        "positions": [1, 2, 3, 8, 9, 10],
+        "zones":     [(1, 3), (1, 3), (1, 3), (8, 10), (8, 10), (8, 10)],
+    },
+    "j2_3_east_a": {
+        "table":     "j2_3_east_a",
+        "positions": [1, 10],
+        "zones":     [(1, 3), (8, 10)],
+    },
+    "j2_3_east_b": {
+        "table":     "j2_3_east_b",
+        "positions": [1, 10],
+        "zones":     [(1, 3), (8, 10)],
+    },
+    "j2_3_west_a": {
+        "table":     "j2_3_west_a",
+        "positions": [1, 10],
+        "zones":     [(1, 3), (8, 10)],
+    },
+    "j2_3_west_b": {
+        "table":     "j2_3_west_b",
+        "positions": [1, 10],
+        "zones":     [(1, 3), (8, 10)],
+    },
+    # winner predictions are playoff-determined: no table to look up yet
+    "j1_winner":   None,
+    "j2_3_winner": None,
+}
+
+J1_GROUPS   = ["j1_east", "j1_west"]
+J2J3_GROUPS = ["j2_3_east_a", "j2_3_east_b", "j2_3_west_a", "j2_3_west_b"]
+
+
+def score_prediction(actual_pos, expected_pos, zone):
+    """Return points for one prediction: 2 for exact match + 1 for correct zone.
+
+    Only call when actual_pos is not None.
+    """
+    low, high = zone
+    points = 0
+    if actual_pos == expected_pos:
+        points += 2
+    if low <= actual_pos <= high:
+        points += 1
+    return points
+
+
+def score_predictions(actual, expected_pos, zone):
+    """Vectorized score_prediction over a nullable Int64 Series of positions.
+
+    Entries with no actual position stay <NA>.
+    """
+    low, high = zone
+    exact = (actual == expected_pos).astype("Int64")
+    in_zone = actual.between(low, high).astype("Int64")
+    return exact * 2 + in_zone
+
+
+def load_standings(conn, year):
+    """Return {group: {team_id: position}} for every scored group whose table exists.
+
+    Clubs without a TeamId (not in the registry) are left out: no pick can match them.
+    """
+    standings = {}
+    for group, scoring in GROUP_SCORING.items():
+        if not scoring:
+            continue
+        try:
+            cursor = conn.execute(f'SELECT TeamId, Position FROM "{scoring["table"]}_{year}" '
+                                  f'WHERE TeamId IS NOT NULL')
+        except sqlite3.OperationalError:
+            continue
+        standings[group] = dict(cursor.fetchall())
+    return standings
+
+
+def load_records(year, registry=None):
+    """Return {group: DataFrame} of the full standings JSON for every scored group.
+
+    Rows are in table order, with TeamId holding the club's registry ID (None
+    if unknown), Team its display name (as in the jpred table) and Remaining
+    the games each club has left in its double round robin. Groups without a
+    tables/{year}/{group}.json are left out.
+    """
+    registry = registry or team_registry.load_registry()
+    records = {}
+    for group, scoring in GROUP_SCORING.items():
+        if not scoring:
+            continue
+        path = Path(f'tables/{year}/{scoring["table"]}.json')
+        if not path.exists():
+            continue
+        df = pd.DataFrame(json.loads(path.read_text(encoding='utf-8')))
+        df = df.sort_values('Position', ignore_index=True)
+        ids = registry.ids(df['Club'])
+        df['TeamId'] = ids.astype(object).where(ids.notna(), None)
+        df['Team'] = registry.canonical_names(df['Club'])
+        df['Remaining'] = (2 * (len(df) - 1) - df['Played']).clip(lower=0)
+        records[group] = df
+    return records
+
+
+def load_picks(conn, league_predictions):
+    """Return every participant's picks as TeamIds, a DataFrame indexed by Name, in jpred order.
+
+    There is one nullable Int64 column per prediction column of
+    league_predictions ({group: columns}, a column's position being its slot
+    in predictions). A blank pick or a column missing from the table is <NA>,
+    and a participant listed twice keeps their first row.
+    """
+    users = conn.execute('SELECT user_id, name FROM users ORDER BY user_id').fetchall()
+    user_ids = pd.Index([user_id for user_id, _ in users])
+    picks = {}
+    for group, cols in league_predictions.items():
+        for slot, col in enumerate(cols):
+            rows = conn.execute('SELECT user_id, team_id FROM predictions WHERE "group" = ? AND slot = ?',
+                                (group, slot)).fetchall()
+            picks[col] = pd.Series(dict(rows), dtype="Int64").reindex(user_ids)
+    all_cols = [col for cols in league_predictions.values() for col in cols]
+    df = pd.DataFrame(picks, index=user_ids, columns=all_cols, dtype="Int64")
+    df.index = pd.Index([name for _, name in users], name="Name")
+    return df[~df.index.duplicated()]
+
+
+def pick_names(conn, picks):
+    """Return load_picks output with every TeamId replaced by its team name ("" if blank)."""
+    names = dict(conn.execute('SELECT team_id, name FROM teams'))
+    return picks.apply(lambda col: col.map(names)).astype(object).fillna("")
+
+
+def score_all(conn, year, league_predictions):
+    """Score every participant against the current standings in one batched pass.
+
+    Returns (picks, positions, points, totals), all DataFrames indexed by Name:
+      picks     - the TeamId picked for every prediction column (load_picks)
+      positions - actual position of each pick in a scored group (<NA> if unknown)
+      points    - points for each pick in a scored group (<NA> if unknown)
+      totals    - total, j1, j2j3, j1_exact, j2j3_exact, total_exact, has_score
+    """
+    standings = load_standings(conn, year)
+    picks = load_picks(conn, league_predictions)
+
+    positions = {}
+    points = {}
+    for group, cols in league_predictions.items():
+        scoring = GROUP_SCORING.get(group)
+        table = standings.get(group)
+        if not scoring or table is None:
+            continue
+        for i, col in enumerate(cols):
+            actual = picks[col].map(table).astype("Int64")
+            positions[col] = actual
+            points[col] = score_predictions(actual, scoring["positions"][i], scoring["zones"][i])
+
+    positions = pd.DataFrame(positions, index=picks.index, dtype="Int64")
+    points = pd.DataFrame(points, index=picks.index, dtype="Int64")
+
+    j1_cols   = [c for g in J1_GROUPS for c in league_predictions.get(g, []) if c in points]
+    j2j3_cols = [c for g in J2J3_GROUPS for c in league_predictions.get(g, []) if c in points]
+
+    totals = pd.DataFrame({
+        "total":      points.sum(axis=1),
+        "j1":         points[j1_cols].sum(axis=1),
+        "j2j3":       points[j2j3_cols].sum(axis=1),
+        "j1_exact":   (points[j1_cols] >= 2).sum(axis=1),
+        "j2j3_exact": (points[j2j3_cols] >= 2).sum(axis=1),
+        "has_score":  points.notna().any(axis=1),
+    }, index=picks.index)
+    totals["total_exact"] = totals["j1_exact"] + totals["j2j3_exact"]
+    return picks, positions, points, totals
+
+
+def standings_hash(standings):
+    """Return a stable hash of load_standings output."""
+    payload = json.dumps(standings, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def picks_hash(picks):
+    """Return a stable hash of load_picks output (every participant's picks)."""
+    values = pd.util.hash_pandas_object(picks.reset_index(), index=False).to_numpy()
+    return hashlib.sha256(values.tobytes()).hexdigest()
+
+
+def _create_snapshot_table(conn):
+    """Create score_snapshots, upgrading a table from before picks_hash or user_order was added."""
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(score_snapshots)')}
+    upgrade = bool(columns) and not {'picks_hash', 'user_order'} <= columns
+    if upgrade:
+        conn.execute('ALTER TABLE score_snapshots RENAME TO score_snapshots_old')
+        conn.execute('DROP INDEX IF EXISTS idx_score_snapshots_ts')
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS score_snapshots (
+            snapshot_ts    TEXT    NOT NULL,
+            standings_hash TEXT    NOT NULL,
+            picks_hash     TEXT    NOT NULL,
+            user           TEXT    NOT NULL,
+            user_order     INTEGER NOT NULL,
+            "group"        TEXT    NOT NULL,
+            points         INTEGER NOT NULL,
+            exact          INTEGER NOT NULL,
+            PRIMARY KEY (standings_hash, picks_hash, user, "group")
+        )
+    """)
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_score_snapshots_ts ON score_snapshots (snapshot_ts)')
+    if upgrade:
+        # Older snapshots have no row order: their ties fall back to the user name
+        picks_key = 'picks_hash' if 'picks_hash' in columns else "''"
+        order = 'user_order' if 'user_order' in columns else '0'
+        with conn:
+            conn.execute(f"""
+                INSERT INTO score_snapshots
+                SELECT snapshot_ts, standings_hash, {picks_key}, user, {order}, "group", points, exact
+                FROM score_snapshots_old
+            """)
+            conn.execute('DROP TABLE score_snapshots_old')
+
+
+def write_snapshot(conn, year, picks, points, league_predictions):
+    """Write per-user, per-group points from score_all to score_snapshots.
+
+    Rows are keyed by (standings_hash, picks_hash, user, group), and
+    user_order is the participant's position in picks (jpred row order), the
+    tie-break users.html ranks by. Scoring the
+    same standings and picks again replaces that snapshot's rows, stamped with
+    the current run, so the latest snapshot always matches the current scores:
+    a changed pick or a removed participant makes a new snapshot, and standings
+    that return to an earlier state become the latest again. Returns the
+    snapshot's standings hash, or None if no standings are loaded yet.
+    """
+    standings = load_standings(conn, year)
+    if not standings:
+        return None
+    key = standings_hash(standings)
+    picks_key = picks_hash(picks)
+
+    _create_snapshot_table(conn)
+    snapshot_ts = datetime.now().isoformat(timespec='microseconds')
+
+    order = {user: i for i, user in enumerate(picks.index)}
+    records = []
+    for group in standings:
+        cols = [c for c in league_predictions.get(group, []) if c in points]
+        if not cols:
+            continue
+        group_points = points[cols]
+        scored = group_points.notna().any(axis=1)
+        totals = group_points[scored].sum(axis=1)
+        exact = (group_points[scored] >= 2).sum(axis=1)
+        records.extend(
+            (snapshot_ts, key, picks_key, user, order[user], group, int(totals[user]), int(exact[user]))
+            for user in totals.index
+        )
+
+    with conn:
+        conn.execute('DELETE FROM score_snapshots WHERE standings_hash = ? AND picks_hash = ?',
+                     (key, picks_key))
+        conn.executemany('INSERT INTO score_snapshots VALUES (?, ?, ?, ?, ?, ?, ?, ?)', records)
+    return key
+
+
+def snapshot_times(conn):
+    """Return all snapshot timestamps, newest first ([] if none exist)."""
+    try:
+        rows = conn.execute('SELECT DISTINCT snapshot_ts FROM score_snapshots '
+                            'ORDER BY snapshot_ts DESC').fetchall()
+    except sqlite3.OperationalError:
+        return []
+    return [row[0] for row in rows]
+
+
+def load_leaderboard(conn, snapshot_ts=None):
+    """Return the ranked leaderboard for one snapshot (default: the latest).
+
+    Each entry is a dict with name, points, exact, j1, j2j3, j1_exact and
+    j2j3_exact, ordered like users.html: points, then total exact matches,
+    then J1 exact matches, then jpred row order (user_order).
+    """
+    if snapshot_ts is None:
+        times = snapshot_times(conn)
+        if not times:
+            return []
+        snapshot_ts = times[0]
+
+    j1 = ', '.join(f"'{g}'" for g in J1_GROUPS)
+    cursor = conn.execute(f"""
+        SELECT user,
+               SUM(points),
+               SUM(exact),
+               SUM(CASE WHEN "group" IN ({j1}) THEN points ELSE 0 END),
+               SUM(CASE WHEN "group" IN ({j1}) THEN 0 ELSE points END),
+               SUM(CASE WHEN "group" IN ({j1}) THEN exact ELSE 0 END),
+               SUM(CASE WHEN "group" IN ({j1}) THEN 0 ELSE exact END)
+        FROM score_snapshots
+        WHERE snapshot_ts = ?
+        GROUP BY user
+        ORDER BY 2 DESC, 3 DESC, 6 DESC, MIN(user_order), user
+    """, (snapshot_ts,))
+    return [
+        {"name": name, "points": points, "exact": exact, "j1": j1_points, "j2j3": j2j3_points,
+         "j1_exact": j1_exact, "j2j3_exact": j2j3_exact}
+        for name, points, exact, j1_points, j2j3_points, j1_exact, j2j3_exact in cursor
+    ]
+
+
+def rank_movement(conn):
+    """Return {user: places gained} between the latest two snapshots.
+
+    Positive means the participant moved up. Participants missing from the
+    previous snapshot are left out.
+    """
+    times = snapshot_times(conn)
+    if len(times) < 2:
+        return {}
+    current = {e["name"]: rank for rank, e in enumerate(load_leaderboard(conn, times[0]), 1)}
+    previous = {e["name"]: rank for rank, e in enumerate(load_leaderboard(conn, times[1]), 1)}
+    return {name: previous[name] - rank for name, rank in current.items() if name in previous}
@@ -0,0 +1,90 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.11"
+# dependencies = [
+#     "requests",
+#     "beautifulsoup4",
+#     "click",
+#     "lxml",
+# ]
+# ///
+"""
+Benchmark the scraper's HTML parser backends on saved standings pages.
+
+Every page is parsed with each backend (see scrape.PARSERS). The script checks
+that all backends return identical rows, then prints the mean time per page
+and the speedup over BeautifulSoup.
+
+Pages are read from a directory of *.html.gz files written by http_cache.py
+or plain *.html files. The default is fixtures/: saved J1 and J2/J3 standings
+pages, the second with the edge cases the backends must agree on (club cells
+without a short name, missing form cells, skipped short rows, a section
+without a table, a table without <tbody>). Point --pages_dir at the
+scraper's cache to check freshly downloaded pages too.
+
+Usage:
+  ./bench_parser.py                       # pages in fixtures/
+  ./bench_parser.py --pages_dir downloads --repeat 50
+"""
+
+import glob
+import gzip
+import os
+import time
+import click
+
+import scrape
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_pages(pages_dir):
+    """Return {filename: html} for every cached page in pages_dir."""
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(pages_dir, "*.html.gz"))):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            pages[os.path.basename(path)] = f.read()
+    for path in sorted(glob.glob(os.path.join(pages_dir, "*.html"))):
+        with open(path, encoding="utf-8") as f:
+            pages[os.path.basename(path)] = f.read()
+    return pages
+
+
+def time_parser(html, parser, repeat):
+    """Return the mean seconds per parse_sections call."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        scrape.parse_sections(html, parser)
+    return (time.perf_counter() - start) / repeat
+
+
+@click.command()
+@click.option("--pages_dir", default=FIXTURES_DIR, help="Directory of saved standings pages (default: fixtures/)")
+@click.option("--repeat", "-n", default=20, show_default=True, help="Parses per page per backend")
+def main(pages_dir, repeat):
+    """Compare parser backends for speed and identical output."""
+    pages = load_pages(pages_dir)
+    if not pages:
+        print(f"Error: no *.html or *.html.gz pages in {pages_dir}")
+        raise SystemExit(1)
+
+    parsers = [p for p in scrape.PARSERS if p != "lxml" or scrape.parse_lxml is not None]
+    print(f"{'Page':<24}" + "".join(f"{p + ' (ms)':>12}" for p in parsers) + f"{'Speedup':>10}")
+
+    mismatches = 0
+    for name, html in pages.items():
+        results = {p: scrape.parse_sections(html, p) for p in parsers}
+        if any(results[p] != results["bs4"] for p in parsers):
+            print(f"{name}: backends disagree")
+            mismatches += 1
+            continue
+        times = {p: time_parser(html, p, repeat) for p in parsers}
+        speedup = times["bs4"] / min(times.values())
+        print(f"{name:<24}" + "".join(f"{times[p] * 1000:>12.2f}" for p in parsers) + f"{speedup:>9.1f}x")
+
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Conditional-GET HTTP cache for the J.League scraper.
+
+Pages are stored gzip-compressed in the download directory together with a
+small JSON metadata file holding the validators the server sent (ETag and
+Last-Modified) and the time the copy was last confirmed fresh.
+
+A cached copy younger than its TTL is returned without touching the network.
+Once it is older, the page is re-requested with If-None-Match /
+If-Modified-Since: a 304 Not Modified refreshes the timestamp and returns the
+cached body, so a poll of an unchanged page costs one small response instead of
+a full download. All requests go through one pooled requests.Session.
+
+TTLs can be set per URL; a TTL of 0 revalidates on every call.
+
+Both files are written to a temporary file and renamed into place, and the
+metadata records a SHA-256 of the body, so an interrupted run never leaves a
+half-written page or validators that belong to a different body; a mismatched
+pair is ignored and the page is fetched again.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# atomic_output is shared with the site build (manifest.py, one level up)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from manifest import atomic_output  # noqa: E402
+
+DEFAULT_TTL = 86400  # seconds
+TIMEOUT = 30  # seconds
+
+
+def body_digest(body):
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+def make_session(pool_size=8):
+    """Return a requests.Session with a connection pool shared by all fetches."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class HttpCache:
+    """Conditional-GET cache rooted at cache_dir.
+
+    ttls maps URL -> TTL in seconds; URLs not listed use default_ttl.
+    """
+
+    def __init__(self, cache_dir, ttls=None, default_ttl=DEFAULT_TTL, session=None):
+        self.cache_dir = cache_dir
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self.session = session or make_session()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, cache_key):
+        return (os.path.join(self.cache_dir, f"{cache_key}.html.gz"),
+                os.path.join(self.cache_dir, f"{cache_key}_meta.json"))
+
+    def _load(self, cache_key):
+        """Return (body, meta) for a cached page, or (None, {}) if there is none."""
+        body_file, meta_file = self._paths(cache_key)
+        if not (os.path.exists(body_file) and os.path.exists(meta_file)):
+            return None, {}
+        try:
+            with open(meta_file) as f:
+                meta = json.load(f)
+            with gzip.open(body_file, "rt", encoding="utf-8") as f:
+                body = f.read()
+        except (OSError, json.JSONDecodeError, EOFError):
+            return None, {}
+        if meta.get("sha256") != body_digest(body):
+            # Body and metadata from different runs: refetch
+            return None, {}
+        return body, meta
+
+    def _save_meta(self, cache_key, meta):
+        _, meta_file = self._paths(cache_key)
+        with atomic_output(meta_file) as tmp, open(tmp, "w") as f:
+            json.dump(meta, f)
+
+    def get(self, url, cache_key, ttl=None):
+        """Return the page body for url, using the cache where possible.
+
+        Returns None if the page could not be fetched and nothing is cached.
+        """
+        if ttl is None:
+            ttl = self.ttls.get(url, self.default_ttl)
+
+        body, meta = self._load(cache_key)
+        headers = {}
+        if body is not None:
+            try:
+                age = (datetime.now() - datetime.fromisoformat(meta["timestamp"])).total_seconds()
+            except (KeyError, ValueError):
+                age = None
+            if age is not None and age < ttl:
+                print(f"Using cached {cache_key} ({int(age)}s old)")
+                return body
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        try:
+            resp = self.session.get(url, headers=headers, timeout=TIMEOUT)
+        except requests.exceptions.RequestException as e:
+            if body is not None:
+                print(f"Warning: could not reach {url} ({e}), using cache.")
+                return body
+            print(f"Error: could not fetch {url} ({e})")
+            return None
+
+        if resp.status_code == 304 and body is not None:
+            print(f"Not modified: {url}")
+            meta["timestamp"] = datetime.now().isoformat()
+            self._save_meta(cache_key, meta)
+            return body
+
+        if resp.status_code != 200:
+            print(f"Error: HTTP {resp.status_code} for {url}")
+            return None
+
+        print(f"Downloaded {url}")
+        html = resp.text
+        body_file, _ = self._paths(cache_key)
+        with atomic_output(body_file) as tmp, gzip.open(tmp, "wt", encoding="utf-8") as f:
+            f.write(html)
+        self._save_meta(cache_key, {
+            "url":           url,
+            "etag":          resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+            "timestamp":     datetime.now().isoformat(),
+            "sha256":        body_digest(html),
+        })
+        return html
@@ -0,0 +1,96 @@
+"""
+lxml parser backend for the J.League standings pages.
+
+Produces exactly the same rows as the BeautifulSoup code in scrape.py
+(parse_sections / parse_table), but parses with libxml2 and selects the
+h4.leftRedTit headers, scoreTable01 tables, rows and cells with XPath
+expressions compiled once at import time.
+
+scrape.py uses this backend when lxml is installed and falls back to
+BeautifulSoup otherwise (see --parser).
+"""
+
+from lxml import etree
+from lxml import html as lxml_html
+
+FORM_MAP = {"01": "W", "02": "D", "03": "L"}
+
+
+def _has_class(name):
+    """XPath predicate matching elements whose class attribute contains name."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# Headers and standings tables together, in document order
+SECTION_NODES = etree.XPath(
+    f"//h4[{_has_class('leftRedTit')}] | //table[{_has_class('scoreTable01')}]"
+)
+# All rows of a table's first tbody (BeautifulSoup: table.find("tbody").find_all("tr"))
+TABLE_ROWS = etree.XPath("(.//tbody)[1]//tr")
+ROW_CELLS  = etree.XPath(".//td")
+CLUB_SPAN  = etree.XPath(f".//span[{_has_class('embS')}]")
+FORM_SRCS  = etree.XPath(".//img/@src")
+
+_parser = lxml_html.HTMLParser(encoding="utf-8")
+
+
+def safe_int(value):
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return 0
+
+
+def parse_form(td):
+    """Extract form string (e.g. 'WDLWW') from the last-5-matches cell."""
+    result = []
+    for src in FORM_SRCS(td):
+        # src looks like /img/common/ico_match01.png
+        key = src.rsplit("ico_match", 1)[-1].replace(".png", "")
+        result.append(FORM_MAP.get(key, "?"))
+    return "".join(result)
+
+
+def parse_table(table):
+    """Return the list of team dicts for one scoreTable01 standings table."""
+    rows = []
+    for tr in TABLE_ROWS(table):
+        cols = ROW_CELLS(tr)
+        if len(cols) < 12:
+            continue
+        text = [td.text_content().strip() for td in cols[:12]]
+        span = CLUB_SPAN(cols[2])
+        club = span[0].text_content().strip() if span else text[2]
+        rows.append({
+            "Position":        safe_int(text[1]),
+            "Club":            club,
+            "Points":          safe_int(text[3]),
+            "Played":          safe_int(text[4]),
+            "Won":             safe_int(text[5]),
+            "PK Won":          safe_int(text[6]),
+            "PK Lost":         safe_int(text[7]),
+            "Lost":            safe_int(text[8]),
+            "Goals For":       safe_int(text[9]),
+            "Goals Against":   safe_int(text[10]),
+            "Goal Difference": safe_int(text[11]),
+            "Form":            parse_form(cols[12]) if len(cols) > 12 else "",
+        })
+    return rows
+
+
+def parse_sections(html):
+    """Return {header text: list of team dicts} for every section of a page.
+
+    Each h4.leftRedTit header is paired with the first scoreTable01 table that
+    follows it, as in the BeautifulSoup backend.
+    """
+    root = lxml_html.document_fromstring(html.encode("utf-8"), parser=_parser)
+    sections = {}
+    header = None
+    for node in SECTION_NODES(root):
+        if node.tag == "h4":
+            header = node.text_content().strip()
+        elif header is not None:
+            sections[header] = parse_table(node)
+            header = None
+    return sections
@@ -5,6 +5,7 @@
 #     "requests",
 #     "beautifulsoup4",
 #     "click",
+#     "lxml",
 # ]
 # ///
 """
@@ -22,16 +23,38 @@ Usage:
   ./scrape.py --league j1_east
   ./scrape.py --league j1_west
   ./scrape.py --league j2_3_east_a
-  ./update_tables.sh   # scrape all six groups
+  ./scrape.py --all    # scrape all six groups
+  ./update_tables.sh   # same as --all
+
+--all fetches each distinct source page once (concurrently), parses each page
+once and extracts every section from that single parse.
+
+Pages are parsed with lxml (parse_lxml.py) when it is installed, falling back
+to BeautifulSoup; both backends produce identical rows. Use --parser to force
+one. bench_parser.py checks that on the saved pages in fixtures/ and compares
+their speed.
+
+Pages are cached gzip-compressed in --download_dir (see http_cache.py). A copy
+older than --ttl seconds (default one day) is revalidated with a conditional
+GET, so an unchanged page costs a 304 rather than a full download. Use
+--ttl 0 on match days to always revalidate, or --page-ttl to set the TTL of one
+source page (by cache key or URL), e.g. --page-ttl j1=0 --page-ttl j2j3=3600.
 """
 
-import requests
 from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import os
 import json
 import click
 
+from http_cache import HttpCache
+
+try:
+    import parse_lxml
+except ImportError:
+    parse_lxml = None
+
 current_year = datetime.now().year
 
 # Maps CLI league name -> (cache_key, source_url, section_header_substring)
@@ -46,6 +69,37 @@ LEAGUE_CONFIG = {
 
 FORM_MAP = {"01": "W", "02": "D", "03": "L"}
 
+# Parser backends, fastest first; "auto" picks the first one available
+PARSERS = ["lxml", "bs4"]
+
+# One HttpCache (and so one pooled session) per download directory
+_caches = {}
+
+
+def get_cache(download_dir, ttls=None):
+    """Return the shared HttpCache for download_dir.
+
+    ttls maps URL -> TTL in seconds (see page_ttls) and is added to the cache's
+    per-URL TTLs.
+    """
+    if download_dir not in _caches:
+        _caches[download_dir] = HttpCache(download_dir)
+    if ttls:
+        _caches[download_dir].ttls.update(ttls)
+    return _caches[download_dir]
+
+
+def page_ttls(specs):
+    """Return {url: seconds} for KEY=SECONDS specs, KEY a cache key (j1, j2j3) or a URL."""
+    urls = {cache_key: url for cache_key, url, _ in LEAGUE_CONFIG.values()}
+    ttls = {}
+    for spec in specs:
+        key, sep, seconds = spec.rpartition("=")
+        if not sep or not seconds.isdigit():
+            raise click.BadParameter(f"expected KEY=SECONDS, got {spec!r}", param_hint="--page-ttl")
+        ttls[urls.get(key, key)] = int(seconds)
+    return ttls
+
 
 def safe_int(value):
     try:
@@ -54,52 +108,13 @@ def safe_int(value):
         return 0
 
 
-def fetch_page(url, cache_key, download_dir, year):
-    """Download a page (or return cached HTML if fresh enough)."""
-    html_file = os.path.join(download_dir, f"{cache_key}_{year}.html")
-    meta_file = os.path.join(download_dir, f"{cache_key}_{year}_meta.json")
-
-    use_cache = False
-
-    if os.path.exists(html_file) and os.path.exists(meta_file):
-        try:
-            with open(meta_file) as f:
-                meta = json.load(f)
-            cached_time = datetime.fromisoformat(meta["timestamp"])
-            if (datetime.now() - cached_time).total_seconds() < 86400:
-                use_cache = True
-            else:
-                try:
-                    resp = requests.head(url)
-                    last_modified = resp.headers.get("Last-Modified")
-                    if last_modified and last_modified == meta.get("last_modified"):
-                        meta["timestamp"] = datetime.now().isoformat()
-                        with open(meta_file, "w") as f:
-                            json.dump(meta, f)
-                        use_cache = True
-                except requests.exceptions.RequestException as e:
-                    print(f"Warning: could not check server headers ({e}), using cache.")
-                    use_cache = True
-        except (json.JSONDecodeError, KeyError):
-            use_cache = False
-
-    if use_cache:
-        print(f"Using cached {html_file}")
-        with open(html_file, encoding="utf-8") as f:
-            return f.read()
-
-    print(f"Downloading {url}")
-    resp = requests.get(url)
-    if resp.status_code != 200:
-        print(f"Error: HTTP {resp.status_code} for {url}")
-        return None
-    html = resp.text
-    with open(html_file, "w", encoding="utf-8") as f:
-        f.write(html)
-    meta = {"last_modified": resp.headers.get("Last-Modified"), "timestamp": datetime.now().isoformat()}
-    with open(meta_file, "w") as f:
-        json.dump(meta, f)
-    return html
+def fetch_page(url, cache_key, download_dir, year, ttl=None):
+    """Download a page (or return cached HTML if fresh or not modified).
+
+    ttl overrides the cache TTL in seconds for this call (otherwise the URL's
+    TTL from get_cache, or the default); 0 always revalidates.
+    """
+    return get_cache(download_dir).get(url, f"{cache_key}_{year}", ttl)
 
 
 def parse_form(td):
@@ -113,29 +128,14 @@ def parse_form(td):
     return "".join(result)
 
 
-def parse_section(html, section_id):
-    """Find the standings table for the named section and return a list of team dicts."""
-    soup = BeautifulSoup(html, "html.parser")
-
-    target_h4 = None
-    for h4 in soup.find_all("h4", class_="leftRedTit"):
-        if section_id in h4.get_text():
-            target_h4 = h4
-            break
-
-    if not target_h4:
-        print(f"Error: section '{section_id}' not found. Available h4 headers:")
-        for h4 in soup.find_all("h4", class_="leftRedTit"):
-            print(f"  {h4.get_text().strip()}")
-        return None
-
-    table = target_h4.find_next("table", class_="scoreTable01")
-    if not table:
-        print(f"Error: no table found after section header '{section_id}'")
-        return None
-
+def parse_table(table):
+    """Return the list of team dicts for one scoreTable01 standings table."""
     rows = []
-    for tr in table.find("tbody").find_all("tr"):
+    tbody = table.find("tbody")
+    if tbody is None:
+        # No data rows (e.g. a header-only table); parse_lxml also returns []
+        return rows
+    for tr in tbody.find_all("tr"):
         cols = tr.find_all("td")
         if len(cols) < 12:
             continue
@@ -161,6 +161,125 @@ def parse_section(html, section_id):
     return rows
 
 
+def resolve_parser(parser=None):
+    """Return the backend name to use for parser (None or "auto" = fastest available)."""
+    if parser in (None, "auto"):
+        return "lxml" if parse_lxml is not None else "bs4"
+    if parser == "lxml" and parse_lxml is None:
+        raise click.UsageError("lxml is not installed; use --parser bs4")
+    return parser
+
+
+def parse_section(html, section_id, parser=None):
+    """Find the standings table for the named section and return a list of team dicts."""
+    if resolve_parser(parser) == "lxml":
+        return find_section(parse_lxml.parse_sections(html), section_id)
+
+    soup = BeautifulSoup(html, "html.parser")
+
+    target_h4 = None
+    for h4 in soup.find_all("h4", class_="leftRedTit"):
+        if section_id in h4.get_text():
+            target_h4 = h4
+            break
+
+    if not target_h4:
+        print(f"Error: section '{section_id}' not found. Available h4 headers:")
+        for h4 in soup.find_all("h4", class_="leftRedTit"):
+            print(f"  {h4.get_text().strip()}")
+        return None
+
+    table = target_h4.find_next("table", class_="scoreTable01")
+    if not table:
+        print(f"Error: no table found after section header '{section_id}'")
+        return None
+
+    return parse_table(table)
+
+
+def parse_sections(html, parser=None):
+    """Parse every h4.leftRedTit section of a page in one walk of the tree.
+
+    Returns {header text: list of team dicts} in page order. Each header is
+    paired with the first scoreTable01 table that follows it, as in
+    parse_section.
+    """
+    if resolve_parser(parser) == "lxml":
+        return parse_lxml.parse_sections(html)
+    return parse_sections_bs4(html)
+
+
+def parse_sections_bs4(html):
+    """BeautifulSoup implementation of parse_sections."""
+    soup = BeautifulSoup(html, "html.parser")
+    sections = {}
+    header = None
+    for tag in soup.find_all(["h4", "table"]):
+        classes = tag.get("class") or []
+        if tag.name == "h4" and "leftRedTit" in classes:
+            header = tag.get_text().strip()
+        elif tag.name == "table" and "scoreTable01" in classes and header is not None:
+            sections[header] = parse_table(tag)
+            header = None
+    return sections
+
+
+def find_section(sections, section_id):
+    """Return the rows of the first section whose header contains section_id."""
+    for header, rows in sections.items():
+        if section_id in header:
+            return rows
+    print(f"Error: section '{section_id}' not found. Available h4 headers:")
+    for header in sections:
+        print(f"  {header}")
+    return None
+
+
+def write_table(table, league, out_path):
+    """Write one group's standings to {out_path}/{league}.json and print them."""
+    json_file = os.path.join(out_path, f"{league}.json")
+    with open(json_file, "w") as f:
+        json.dump(table, f, indent=2, ensure_ascii=False)
+    print(f"Written {len(table)} teams to {json_file}")
+    for row in table:
+        print(f"  {row['Position']:2}. {row['Club']} ({row['Points']} pts)")
+
+
+def scrape_all(year, download_dir, out_path, ttl=None, parser=None):
+    """Fetch every distinct source page once, concurrently, and write all groups.
+
+    Returns True if every group was written.
+    """
+    pages = {}
+    for cache_key, url, _ in LEAGUE_CONFIG.values():
+        pages[cache_key] = url
+
+    with ThreadPoolExecutor(max_workers=len(pages)) as pool:
+        futures = {
+            cache_key: pool.submit(fetch_page, url, cache_key, download_dir, year, ttl)
+            for cache_key, url in pages.items()
+        }
+        html_by_key = {cache_key: future.result() for cache_key, future in futures.items()}
+
+    sections_by_key = {
+        cache_key: parse_sections(html, parser)
+        for cache_key, html in html_by_key.items()
+        if html is not None
+    }
+
+    ok = True
+    for league, (cache_key, _, section_id) in LEAGUE_CONFIG.items():
+        if cache_key not in sections_by_key:
+            ok = False
+            continue
+        table = find_section(sections_by_key[cache_key], section_id)
+        if table is None:
+            ok = False
+            continue
+        write_table(table, league, out_path)
+    return ok
+
+
 @click.command()
 @click.option(
     "--league", "-l", default="j1_east",
@@ -170,28 +289,38 @@ def parse_section(html, section_id):
 @click.option("--year", "-y", default=current_year, help="Season year (used for cache and output paths)")
 @click.option("--download_dir", default="downloads", help="Directory for cached HTML files")
 @click.option("--output_dir", default="tables", help="Base directory for JSON output")
-def main(league, year, download_dir, output_dir):
+@click.option("--all", "all_leagues", is_flag=True, help="Scrape every group, fetching each source page once")
+@click.option("--ttl", type=int, default=None,
+              help="Seconds a cached page is used without revalidating (default 86400; 0 = always revalidate)")
+@click.option("--page-ttl", "page_ttl", multiple=True, metavar="KEY=SECONDS",
+              help="TTL for one source page, by cache key (j1, j2j3) or URL; repeatable. --ttl overrides it.")
+@click.option("--parser", type=click.Choice(["auto"] + PARSERS), default="auto", show_default=True,
+              help="HTML parser backend (auto = lxml if installed, else bs4)")
+def main(league, year, download_dir, output_dir, all_leagues, ttl, page_ttl, parser):
     """Scrape J.League standings for one regional group and write JSON output."""
     cache_key, url, section_id = LEAGUE_CONFIG[league]
 
     os.makedirs(download_dir, exist_ok=True)
+    get_cache(download_dir, page_ttls(page_ttl))
     out_path = os.path.join(output_dir, str(year))
     os.makedirs(out_path, exist_ok=True)
 
-    html = fetch_page(url, cache_key, download_dir, year)
+    parser = resolve_parser(parser)
+
+    if all_leagues:
+        if not scrape_all(year, download_dir, out_path, ttl, parser):
+            raise SystemExit(1)
+        return
+
+    html = fetch_page(url, cache_key, download_dir, year, ttl)
     if html is None:
         raise SystemExit(1)
 
-    table = parse_section(html, section_id)
+    table = parse_section(html, section_id, parser)
     if table is None:
         raise SystemExit(1)
 
-    json_file = os.path.join(out_path, f"{league}.json")
-    with open(json_file, "w") as f:
-        json.dump(table, f, indent=2, ensure_ascii=False)
-    print(f"Written {len(table)} teams to {json_file}")
-    for row in table:
-        print(f"  {row['Position']:2}. {row['Club']} ({row['Points']} pts)")
+    write_table(table, league, out_path)
 
 
 if __name__ == "__main__":
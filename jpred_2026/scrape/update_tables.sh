@@ -1,6 +1,2 @@
-./scrape.py --league j1_east --output_dir ../tables
-./scrape.py --league j1_west --output_dir ../tables
-./scrape.py --league j2_3_east_a --output_dir ../tables
-./scrape.py --league j2_3_east_b --output_dir ../tables
-./scrape.py --league j2_3_west_a --output_dir ../tables
-./scrape.py --league j2_3_west_b --output_dir ../tables
+# Fetch each source page once and write all six group tables
+./scrape.py --all --output_dir ../tables
@@ -0,0 +1,125 @@
+// Participant and team search for the JPred pages.
+//
+// Loads the prebuilt indexes written by search_index.py the first time the
+// search box is used, then answers each keystroke with a binary search over
+// the sorted keys. Copied to docs/ by build.py.
+(function () {
+    'use strict';
+
+    var SOURCES = ['search-teams.json', 'search-users.json'];
+    var MAX_RESULTS = 20;
+    // Keys scanned per index for one query, so a one-letter query stays fast
+    var MAX_SCAN = 5000;
+
+    var input = document.getElementById('search');
+    var list = document.getElementById('search-results');
+    if (!input || !list) {
+        return;
+    }
+
+    var loading = null;
+    var indexes = [];
+
+    function load() {
+        if (!loading) {
+            loading = Promise.all(SOURCES.map(function (url) {
+                return fetch(url)
+                    .then(function (response) { return response.ok ? response.json() : null; })
+                    .catch(function () { return null; });
+            })).then(function (loaded) {
+                indexes = loaded.filter(Boolean);
+            });
+        }
+        return loading;
+    }
+
+    // Same normalization as search_index.index_keys: NFKC, lower case
+    // (str.lower there), spaces and punctuation dropped
+    function normalize(text) {
+        return text.normalize('NFKC').toLowerCase().replace(/[^\p{L}\p{N}]+/gu, '');
+    }
+
+    // Replace {} in template; a function, so a '$' in value is taken literally
+    function fill(template, value) {
+        return template.replace('{}', function () { return String(value); });
+    }
+
+    function lowerBound(keys, query) {
+        var lo = 0;
+        var hi = keys.length;
+        while (lo < hi) {
+            var mid = (lo + hi) >>> 1;
+            if (keys[mid] < query) {
+                lo = mid + 1;
+            } else {
+                hi = mid;
+            }
+        }
+        return lo;
+    }
+
+    // Results ([label, href, note]) of one index whose keys start with query,
+    // in entry order (teams A-Z, participants by rank)
+    function lookup(index, query) {
+        var found = {};
+        var refs = [];
+        var start = lowerBound(index.keys, query);
+        var end = Math.min(index.keys.length, start + MAX_SCAN);
+        for (var i = start; i < end; i++) {
+            if (index.keys[i].lastIndexOf(query, 0) !== 0) {
+                break;
+            }
+            var ref = index.refs[i];
+            if (!found[ref]) {
+                found[ref] = true;
+                refs.push(ref);
+            }
+        }
+        refs.sort(function (a, b) { return a - b; });
+        return refs.map(function (ref) {
+            var entry = index.entries[ref];
+            var target = entry.length > 2 ? entry[2] : entry[0];
+            var note = entry[1] === '' ? '' : fill(index.note, entry[1]);
+            return [entry[0], fill(index.href, target), note];
+        });
+    }
+
+    function render(results) {
+        list.textContent = '';
+        results.slice(0, MAX_RESULTS).forEach(function (entry) {
+            var item = document.createElement('li');
+            var link = document.createElement('a');
+            link.setAttribute('href', entry[1]);
+            link.textContent = entry[0];
+            item.appendChild(link);
+            if (entry[2]) {
+                var note = document.createElement('span');
+                note.className = 'search-note';
+                note.textContent = entry[2];
+                item.appendChild(note);
+            }
+            list.appendChild(item);
+        });
+    }
+
+    function search() {
+        var query = normalize(input.value);
+        if (!query) {
+            render([]);
+            return;
+        }
+        load().then(function () {
+            if (normalize(input.value) !== query) {
+                return;
+            }
+            var results = [];
+            indexes.forEach(function (index) {
+                results = results.concat(lookup(index, query));
+            });
+            render(results);
+        });
+    }
+
+    input.addEventListener('focus', load);
+    input.addEventListener('input', search);
+})();
@@ -0,0 +1,69 @@
+"""
+Prebuilt client-side search index for participants and teams.
+
+jpred_users.py writes docs/search-users.json and jpred_teams.py writes
+docs/search-teams.json; search.js loads both the first time the search box is
+used and answers every lookup in the browser. Each file is:
+
+    href     link template, {} replaced by an entry's target
+    note     note template, {} replaced by an entry's note value
+    entries  [[label, note value], ...] or [[label, note value, target], ...];
+             the target defaults to the label
+    keys     sorted lookup keys, a flattened prefix trie
+    refs     refs[i] is the entry for keys[i]
+
+so a participant is just ["name", 12] under "preds/{}.html" and "Rank {}".
+
+Keys are normalized like team_registry.normalize (NFKC, spaces and punctuation
+dropped), but lower-cased with str.lower instead of casefolded: search.js
+lower-cases queries with toLowerCase, the same Unicode mapping, so a name with
+"ß" is found by typing it. Keys start at every word of the indexed text, so
+"smi" finds "John Smith" and "johnsm" finds it too. Words with non-ASCII
+characters (Japanese names have no spaces) are indexed from every character. A
+lookup is a binary search for the query followed by a short scan of the keys
+sharing its prefix.
+
+Keys are sorted in UTF-16 code unit order, the order JavaScript compares
+strings in.
+"""
+import re
+import unicodedata
+
+from manifest import write_json
+
+_SEPARATORS = re.compile(r'[\W_]+')
+
+
+def index_keys(text):
+    """Return the lookup keys for text: its normalized form from each word start."""
+    words = [w for w in _SEPARATORS.split(unicodedata.normalize('NFKC', str(text)).lower()) if w]
+    keys = set()
+    for i, word in enumerate(words):
+        rest = ''.join(words[i + 1:])
+        for start in ([0] if word.isascii() else range(len(word))):
+            keys.add(word[start:] + rest)
+    return keys
+
+
+def _utf16(key):
+    return key.encode('utf-16-be')
+
+
+def build_search_index(href, note, entries, texts):
+    """Return the index for entries (see above), each found by any of the strings in texts[i]."""
+    pairs = sorted(
+        {(key, i) for i, entry_texts in enumerate(texts) for text in entry_texts for key in index_keys(text)},
+        key=lambda pair: (_utf16(pair[0]), pair[1]),
+    )
+    return {
+        'href': href,
+        'note': note,
+        'entries': entries,
+        'keys': [key for key, _ in pairs],
+        'refs': [i for _, i in pairs],
+    }
+
+
+def write_search_index(output, href, note, entries, texts, manifest=None):
+    """Build and write a search index, skipping it if unchanged. Returns True if written."""
+    return write_json(output, build_search_index(href, note, entries, texts), manifest)
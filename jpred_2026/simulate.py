@@ -0,0 +1,262 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.11"
+# dependencies = [
+#     "click",
+#     "jinja2",
+#     "numpy",
+#     "pandas",
+# ]
+# ///
+"""
+Monte Carlo season simulator: each participant's expected final score and
+probability of finishing first.
+
+Every scored group (GROUP_SCORING in scoring.py) is played out to the end of
+its double round robin (2 x (clubs - 1) games per club) many times:
+
+  - each club's remaining games are drawn from its record so far (Won, PK Won,
+    PK Lost, Lost in tables/{year}/{group}.json), shrunk towards the group's
+    average over PRIOR_GAMES games; the fixtures are not in the standings, so
+    clubs' remaining games are drawn independently
+  - 2026 points: 3 for a win, 2 for a PK shootout win, 1 for a PK shootout loss
+  - ties on points keep the current order (goal difference, goals scored)
+
+Every participant is then scored against every simulated final table, as in
+scoring.score_all. A batch of simulations is one matrix product: for each
+(prediction column, club) pair the points that pick earns in each simulation,
+times a 0/1 matrix of who picked what. Totals are ranked like the leaderboard
+(points, then exact matches, then J1 exact matches); a tie for first shares
+the win.
+
+Batches are spread over a process pool (--jobs, default: every core), each
+with its own random stream from --seed, so results are reproducible for a
+given seed, number of simulations and batch size.
+
+Results are printed and stored in the win_probabilities table, keyed by the
+standings hash used for score_snapshots.
+
+Usage:
+    simulate.py [--year YEAR] [--simulations N] [--jobs N] [--seed N] [--top N] [--profile]
+"""
+import click
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import instrument
+from jpred_users import league_predictions
+from scoring import GROUP_SCORING, J1_GROUPS, load_picks, load_records, load_standings, standings_hash
+
+# Simulations per batch: one (batch x participants) matrix at a time per worker
+BATCH_SIZE = 1000
+
+# Games of group-average results added to each club's record
+PRIOR_GAMES = 5
+
+# Points for (win, PK win, PK loss, loss)
+RESULT_POINTS = np.array([3, 2, 1, 0])
+RESULT_COLUMNS = ['Won', 'PK Won', 'PK Lost', 'Lost']
+
+# Ranking key per pick: points, then exact matches, then J1 exact matches.
+# Totals stay below 2**24, so float32 sums of these keys are exact.
+POINTS_WEIGHT, EXACT_WEIGHT, J1_EXACT_WEIGHT = 10000, 100, 1
+
+
+def load_groups(year, registry=None):
+    """Return {group: standings} for every scored group with a standings JSON.
+
+    standings is a dict of club TeamIds (None if unknown, as in load_records),
+    points, remaining games and per-game result probabilities, in table order.
+    """
+    groups = {}
+    for group, df in load_records(year, registry).items():
+        counts = df[RESULT_COLUMNS].to_numpy(dtype=float)
+        played = df['Played'].to_numpy()
+        average = counts.sum(axis=0) / max(played.sum(), 1)
+        groups[group] = {
+            'teams':     list(df['TeamId']),
+            'points':    df['Points'].to_numpy(dtype=np.int64),
+            'remaining': df['Remaining'].to_numpy(),
+            'probs':     (counts + PRIOR_GAMES * average) / (played + PRIOR_GAMES)[:, None],
+        }
+    return groups
+
+
+def simulate_positions(rng, standings, n):
+    """Return an (n, clubs) array: each club's final position in n simulated seasons."""
+    teams = len(standings['teams'])
+    final = np.repeat(standings['points'][None, :], n, axis=0)
+    for t in range(teams):
+        if standings['remaining'][t]:
+            results = rng.multinomial(standings['remaining'][t], standings['probs'][t], size=n)
+            final[:, t] += results @ RESULT_POINTS
+    # Higher points first; ties keep the current table order
+    key = final * (teams + 1) + (teams - np.arange(teams))
+    order = np.argsort(-key, axis=1, kind='stable')
+    positions = np.empty_like(order)
+    np.put_along_axis(positions, order, np.arange(1, teams + 1)[None, :], axis=1)
+    return positions
+
+
+def prediction_features(groups):
+    """Return [(group, column, slot)] for every scored prediction column, in feature order.
+
+    Each one contributes one feature per club in its group.
+    """
+    return [
+        (group, col, slot)
+        for group in groups
+        for slot, col in enumerate(league_predictions.get(group, []))
+    ]
+
+
+def pick_matrix(picks, groups, features):
+    """Return a (features, participants) float32 0/1 matrix: who picked which club where."""
+    offsets = np.cumsum([0] + [len(groups[g]['teams']) for g, _, _ in features])
+    matrix = np.zeros((offsets[-1], len(picks)), dtype=np.float32)
+    for (group, col, _), offset in zip(features, offsets):
+        if col not in picks:
+            continue
+        index = {team: i for i, team in enumerate(groups[group]['teams']) if team is not None}
+        team = picks[col].map(index)
+        chosen = team.notna().to_numpy()
+        matrix[offset + team[chosen].astype(int).to_numpy(), np.flatnonzero(chosen)] = 1
+    return matrix
+
+
+def feature_values(positions, groups, features):
+    """Return (points, keys): per-simulation points and ranking key of every feature.
+
+    positions is {group: simulate_positions output}; both results are
+    (n, features) float32.
+    """
+    points, keys = [], []
+    for group, _, slot in features:
+        scoring = GROUP_SCORING[group]
+        low, high = scoring['zones'][slot]
+        pos = positions[group]
+        exact = pos == scoring['positions'][slot]
+        score = 2 * exact + ((pos >= low) & (pos <= high))
+        points.append(score)
+        keys.append(score * POINTS_WEIGHT + exact * (EXACT_WEIGHT + J1_EXACT_WEIGHT * (group in J1_GROUPS)))
+    return (np.concatenate(points, axis=1).astype(np.float32),
+            np.concatenate(keys, axis=1).astype(np.float32))
+
+
+# Per-process state for pool workers, set up once by _init_worker
+_worker = {}
+
+
+def _init_worker(groups, features, matrix):
+    _worker.update(groups=groups, features=features, matrix=matrix)
+
+
+def simulate_batch(seed, n):
+    """Run n simulations. Returns (summed feature points, first-place share per participant)."""
+    groups, features, matrix = _worker['groups'], _worker['features'], _worker['matrix']
+    rng = np.random.default_rng(seed)
+    positions = {group: simulate_positions(rng, standings, n) for group, standings in groups.items()}
+    points, keys = feature_values(positions, groups, features)
+    totals = keys @ matrix  # (n, participants)
+    winners = totals == totals.max(axis=1, keepdims=True)
+    share = winners / winners.sum(axis=1, keepdims=True)
+    return points.sum(axis=0, dtype=np.float64), share.sum(axis=0, dtype=np.float64)
+
+
+@instrument.stage('simulations')
+def simulate(conn, year, simulations, jobs=None, seed=None, batch_size=BATCH_SIZE):
+    """Simulate the rest of the season; returns a DataFrame indexed by Name.
+
+    Columns: expected_points (mean final score) and p_first (probability of
+    finishing first, ties shared). jobs defaults to every core.
+    """
+    groups = load_groups(year)
+    picks = load_picks(conn, league_predictions)
+    features = prediction_features(groups)
+    matrix = pick_matrix(picks, groups, features)
+
+    batches = [min(batch_size, simulations - start) for start in range(0, simulations, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(batches))
+    jobs = jobs or os.cpu_count() or 1
+    print(f"Simulating {simulations} seasons for {len(picks)} participants "
+          f"({len(groups)} groups, {len(batches)} batches, {jobs} process(es))")
+
+    point_sums = np.zeros(matrix.shape[0])
+    first = np.zeros(len(picks))
+    if jobs > 1 and len(batches) > 1:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(groups, features, matrix)) as pool:
+            for batch_points, batch_first in pool.map(simulate_batch, seeds, batches):
+                point_sums += batch_points
+                first += batch_first
+    else:
+        _init_worker(groups, features, matrix)
+        for batch_seed, n in zip(seeds, batches):
+            batch_points, batch_first = simulate_batch(batch_seed, n)
+            point_sums += batch_points
+            first += batch_first
+
+    # Expected score is linear in the picks: mean points per feature times the pick matrix
+    expected = (point_sums / simulations) @ matrix
+    return pd.DataFrame({'expected_points': expected, 'p_first': first / simulations},
+                        index=picks.index)
+
+
+def write_results(conn, year, results, simulations):
+    """Store results in win_probabilities, replacing any earlier run for these standings."""
+    key = standings_hash(load_standings(conn, year))
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS win_probabilities (
+            standings_hash  TEXT    NOT NULL,
+            user            TEXT    NOT NULL,
+            expected_points REAL    NOT NULL,
+            p_first         REAL    NOT NULL,
+            simulations     INTEGER NOT NULL,
+            PRIMARY KEY (standings_hash, user)
+        )
+    """)
+    with conn:
+        conn.execute('DELETE FROM win_probabilities WHERE standings_hash = ?', (key,))
+        conn.executemany(
+            'INSERT INTO win_probabilities VALUES (?, ?, ?, ?, ?)',
+            ((key, name, float(row.expected_points), float(row.p_first), simulations)
+             for name, row in results.iterrows()))
+    return key
+
+
+@click.command()
+@click.option('--year', default=None, help='Season year (e.g. 2026). Auto-detects latest from tables/ if omitted.')
+@click.option('--simulations', '-n', default=100000, show_default=True, type=click.IntRange(min=1),
+              help='Seasons to simulate.')
+@click.option('--jobs', '-j', type=int, default=None, help='Worker processes (default: every core).')
+@click.option('--seed', type=int, default=None, help='Random seed, for reproducible results.')
+@click.option('--top', default=20, show_default=True, help='Participants to print, by chance of finishing first.')
+@click.option('--profile', is_flag=True, help='Write cProfile stats and a Chrome trace to profile/.')
+def main(year, simulations, jobs, seed, top, profile):
+    if not year:
+        tables_dir = Path('tables')
+        year_dirs = [d for d in tables_dir.iterdir() if d.is_dir() and d.name.isdigit()]
+        if not year_dirs:
+            print("Error: could not detect year. Use --year.")
+            raise SystemExit(1)
+        year = max(d.name for d in year_dirs)
+
+    with instrument.run('simulate', profile):
+        conn = instrument.trace(sqlite3.connect(f'jpred_{year}.db'))
+        results = simulate(conn, year, simulations, jobs, seed)
+        write_results(conn, year, results, simulations)
+        conn.close()
+
+        ranked = results.sort_values(['p_first', 'expected_points'], ascending=False).head(top)
+        print(f"\n{'Name':<40} {'Expected':>9} {'P(first)':>9}")
+        for name, row in ranked.iterrows():
+            print(f"{name[:40]:<40} {row.expected_points:9.2f} {row.p_first:9.2%}")
+
+
+if __name__ == '__main__':
+    main()
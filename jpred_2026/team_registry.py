@@ -0,0 +1,150 @@
+"""
+Canonical team registry shared by the form importer and the standings loader.
+
+labels/team_registry.tsv lists every club once:
+
+    TeamId   stable integer ID (never renumbered; new clubs are appended)
+    Name     name as printed in the J.League standings
+    English  English name: the display name stored in the database
+    Aliases  other spellings seen in form exports or tables, |-separated
+
+Every spelling resolves to a TeamId, the key picks and standings are matched
+on (predictions.team_id and the TeamId column of the standings tables, see
+scoring.load_picks and load_standings), and is stored as the club's English
+name (canonical_names), as the site has always shown. Names are matched after normalize() (NFKC, casefold, spaces and
+punctuation dropped), so full-width and half-width spellings (ＦＣ東京 /
+FC東京) and "F.C." / "FC" resolve to the same club. There is no fuzzy
+matching: a name that is not a known spelling is reported once and left
+unresolved until it is added to Aliases, so a near miss is never scored as
+the wrong club.
+
+Any legacy mapping files present in the working directory
+(team_name_mapping.csv, jp_name_mapping.csv) are folded in as extra aliases.
+
+load_registry() compiles the TSV into a dict of normalized spelling -> TeamId
+once per process. ids() and canonical_names() resolve each distinct value of a
+Series once (pd.factorize) and map the rest with a single array lookup.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+REGISTRY_FILE = 'labels/team_registry.tsv'
+
+# Legacy {from: to} mapping files, read as extra aliases when present
+LEGACY_MAPPINGS = [
+    ('team_name_mapping.csv', 'FormName', 'TableName'),
+    ('jp_name_mapping.csv', 'Japanese', 'English'),
+]
+
+_PUNCTUATION = re.compile(r'[\W_]+')
+
+
+def normalize(name):
+    """Return the lookup key for a team name: NFKC, casefolded, without spaces or punctuation."""
+    return _PUNCTUATION.sub('', unicodedata.normalize('NFKC', str(name)).casefold())
+
+
+class TeamRegistry:
+    """Lookup from any known spelling of a club to its TeamId and display name."""
+
+    def __init__(self, teams):
+        """teams is a list of (team_id, name, english, [alias, ...])."""
+        self.names = {}
+        self.english = {}
+        self.index = {}
+        for team_id, name, english, aliases in teams:
+            self.names[team_id] = name
+            self.english[team_id] = english
+            for spelling in [name, english, *aliases]:
+                self.add_alias(spelling, team_id)
+        self.max_id = max(self.names, default=0)
+        self._resolved = {}
+
+    def add_alias(self, spelling, team_id):
+        key = normalize(spelling)
+        if not key:
+            return
+        if self.index.get(key, team_id) != team_id:
+            raise ValueError(f"Team alias {spelling!r} is listed for both "
+                             f"{self.names[self.index[key]]} and {self.names[team_id]}")
+        self.index[key] = team_id
+
+    def display_name(self, team_id):
+        """Return the name shown for a club: its English name (its standings name if it has none)."""
+        return self.english.get(team_id) or self.names[team_id]
+
+    def find(self, name):
+        """Return the TeamId for name, or None, without reporting unknown names."""
+        return self.index.get(normalize(name))
+
+    def resolve(self, name):
+        """Return the TeamId for name, or None if it is not a known spelling."""
+        if name in self._resolved:
+            return self._resolved[name]
+        team_id = self.find(name)
+        if team_id is None and normalize(name):
+            print(f"Unknown team name {name!r}: add it to Aliases in {REGISTRY_FILE}")
+        self._resolved[name] = team_id
+        return team_id
+
+    def _lookup(self, values, value_for):
+        """Map every value through value_for(original), calling it once per distinct value."""
+        codes, uniques = pd.factorize(values, use_na_sentinel=True)
+        table = np.array([value_for(u) for u in uniques] + [None], dtype=object)
+        return table[codes]
+
+    def ids(self, values):
+        """Return a nullable Int64 Series of TeamIds for a Series of names (<NA> if unknown)."""
+        ids = self._lookup(values, self.resolve)
+        return pd.Series(ids, index=values.index, dtype='Int64')
+
+    def canonical_names(self, values):
+        """Return values with every resolvable name replaced by its display name.
+
+        Unknown names are kept as they are; missing values stay missing.
+        """
+        def canonical(name):
+            team_id = self.resolve(name)
+            return name if team_id is None else self.display_name(team_id)
+        names = self._lookup(values, canonical)
+        return pd.Series(names, index=values.index, dtype=object).where(values.notna(), values)
+
+    def canonicalize(self, df, columns):
+        """Replace the names in several DataFrame columns in place, in one pass over all cells."""
+        columns = [c for c in columns if c in df.columns]
+        if not columns or df.empty:
+            return
+        cells = pd.Series(df[columns].to_numpy(dtype=object).ravel())
+        names = self.canonical_names(cells).to_numpy(dtype=object)
+        df[columns] = names.reshape(len(df), len(columns))
+
+
+def read_registry(path=REGISTRY_FILE):
+    """Return [(team_id, name, english, [alias, ...])] from the registry TSV ([] if missing)."""
+    if not Path(path).exists():
+        return []
+    df = pd.read_csv(path, sep='\t', dtype=str, keep_default_na=False)
+    return [
+        (int(row.TeamId), row.Name, row.English, [a for a in row.Aliases.split('|') if a])
+        for row in df.itertuples(index=False)
+    ]
+
+
+@lru_cache(maxsize=None)
+def load_registry(path=REGISTRY_FILE):
+    """Compile the registry (plus any legacy mapping files) once per process."""
+    registry = TeamRegistry(read_registry(path))
+    for csv_path, source, target in LEGACY_MAPPINGS:
+        if not Path(csv_path).exists():
+            continue
+        mapping = pd.read_csv(csv_path, dtype=str).dropna(subset=[source, target])
+        for spelling, name in zip(mapping[source], mapping[target]):
+            team_id = registry.index.get(normalize(name))
+            if team_id is not None:
+                registry.add_alias(spelling, team_id)
+    return registry
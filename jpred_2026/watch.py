@@ -0,0 +1,251 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.11"
+# dependencies = [
+#     "beautifulsoup4",
+#     "click",
+#     "jinja2",
+#     "lxml",
+#     "pandas",
+#     "pillow",
+#     "requests",
+# ]
+# ///
+"""
+Watch the J.League standings and rebuild the site when the tables change.
+
+Replaces running scrape/update_tables.sh, json_to_db.py and make_all.sh by
+hand. One long-running asyncio loop:
+
+  1. fetches both source pages concurrently with scrape.fetch_page (a
+     conditional GET, so an unchanged page costs a 304),
+  2. parses each page once and diffs every group against tables/{year}/*.json,
+  3. writes the JSON of any group whose table changed, and
+  4. only if a team's position moved, re-imports those groups and runs an
+     in-process incremental build (build.build_pages) - pages whose inputs did
+     not change are left alone (see manifest.py).
+
+Polling is adaptive: every ACTIVE_INTERVAL during match windows and for
+COOLDOWN after a change, otherwise every IDLE_INTERVAL (waking early when the
+next match window opens). The clock is injectable so the schedule can be
+driven by a fake clock, and --base-url points the watcher at a local
+stand-in for www.jleague.jp.
+
+Usage:
+    watch.py [--year YEAR] [--image] [--jobs N] [--once] [--base-url URL]
+"""
+import asyncio
+import json
+import sys
+import click
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'scrape'))
+import scrape  # noqa: E402
+
+import build  # noqa: E402
+import json_to_db  # noqa: E402
+
+JST = timezone(timedelta(hours=9))
+JLEAGUE_ROOT = 'https://www.jleague.jp'
+
+# Match windows in JST: weekday (Mon=0) -> [(start_hour, end_hour)]
+MATCH_WINDOWS = {
+    2: [(18, 23)],  # midweek evening fixtures
+    5: [(12, 23)],
+    6: [(12, 23)],
+}
+
+ACTIVE_INTERVAL = 5 * 60        # seconds between polls during a match window
+IDLE_INTERVAL   = 3 * 60 * 60   # seconds between polls otherwise
+COOLDOWN        = 2 * 60 * 60   # keep polling actively this long after a change
+
+
+class Clock:
+    """Wall clock in JST. Tests substitute one whose sleep() advances now()."""
+
+    def now(self):
+        return datetime.now(JST)
+
+    async def sleep(self, seconds):
+        await asyncio.sleep(seconds)
+
+
+def in_match_window(now):
+    """True if now (an aware datetime) falls inside a match window."""
+    now = now.astimezone(JST)
+    return any(start <= now.hour < end for start, end in MATCH_WINDOWS.get(now.weekday(), []))
+
+
+def next_window_start(now):
+    """Return the start of the next match window after now."""
+    now = now.astimezone(JST)
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    for days in range(8):
+        day = midnight + timedelta(days=days)
+        for start, _ in MATCH_WINDOWS.get(day.weekday(), []):
+            opens = day.replace(hour=start)
+            if opens > now:
+                return opens
+    return now + timedelta(seconds=IDLE_INTERVAL)
+
+
+def next_interval(now, last_change=None):
+    """Seconds to wait before the next poll."""
+    if in_match_window(now):
+        return ACTIVE_INTERVAL
+    if last_change is not None and (now - last_change).total_seconds() < COOLDOWN:
+        return ACTIVE_INTERVAL
+    until_window = (next_window_start(now) - now).total_seconds()
+    return max(1, min(IDLE_INTERVAL, until_window))
+
+
+def positions(rows):
+    """Return {club: position} for a list of standings rows."""
+    return {row['Club']: row['Position'] for row in rows or []}
+
+
+def rebuild(year, db_path, leagues, image=False, jobs=1):
+    """Re-import the changed groups' JSON and rebuild the site incrementally."""
+    for league in leagues:
+        json_file = Path('tables') / year / f'{league}.json'
+        json_to_db.json_to_db(json_file, db_path, f'{league}_{year}')
+    build.build_pages(year, db_path, jobs=jobs, image=image)
+
+
+class Watcher:
+    """Polls the standings pages and rebuilds when positions move.
+
+    on_change(leagues) is called (in a worker thread) with the groups whose
+    positions moved; it defaults to rebuild().
+    """
+
+    def __init__(self, year, clock=None, base_url=None, download_dir='scrape/downloads',
+                 tables_dir='tables', on_change=None, image=False, jobs=1):
+        self.year = str(year)
+        self.clock = clock or Clock()
+        self.download_dir = download_dir
+        self.tables_path = Path(tables_dir) / self.year
+        self.tables_path.mkdir(parents=True, exist_ok=True)
+        self.on_change = on_change or (
+            lambda leagues: rebuild(self.year, f'jpred_{self.year}.db', leagues, image, jobs))
+        self.last_change = None
+
+        # cache_key -> url, one entry per distinct source page
+        self.pages = {}
+        for cache_key, url, _ in scrape.LEAGUE_CONFIG.values():
+            if base_url:
+                url = url.replace(JLEAGUE_ROOT, base_url.rstrip('/'))
+            self.pages[cache_key] = url
+        # Always revalidate: an unchanged page costs a 304
+        scrape.get_cache(download_dir, {url: 0 for url in self.pages.values()})
+        self.last_html = {}
+        self.stored = {league: self.load_stored(league) for league in scrape.LEAGUE_CONFIG}
+
+    def load_stored(self, league):
+        """Return the rows last written for league, or None."""
+        json_file = self.tables_path / f'{league}.json'
+        if not json_file.exists():
+            return None
+        with open(json_file, encoding='utf-8') as f:
+            return json.load(f)
+
+    def store(self, league, rows):
+        """Write rows to the group's JSON (removing it if rows is None)."""
+        json_file = self.tables_path / f'{league}.json'
+        if rows is None:
+            json_file.unlink(missing_ok=True)
+        else:
+            with open(json_file, 'w') as f:
+                json.dump(rows, f, indent=2, ensure_ascii=False)
+        self.stored[league] = rows
+
+    async def fetch_all(self):
+        """Fetch every source page concurrently; return {cache_key: html or None}."""
+        keys = list(self.pages)
+        htmls = await asyncio.gather(*(
+            asyncio.to_thread(scrape.fetch_page, self.pages[key], key, self.download_dir, self.year)
+            for key in keys
+        ))
+        return dict(zip(keys, htmls))
+
+    async def poll(self):
+        """Poll once. Returns the groups whose positions moved (and were rebuilt).
+
+        The new pages and tables only count as seen once the rebuild succeeds:
+        if on_change raises, the JSON files are restored and the error is
+        re-raised, so the next poll finds the same changes and rebuilds again.
+        """
+        moved = []
+        fetched = {}
+        updated = {}
+        for cache_key, html in (await self.fetch_all()).items():
+            if html is None or html == self.last_html.get(cache_key):
+                continue
+            fetched[cache_key] = html
+            sections = scrape.parse_sections(html)
+            for league, (key, _, section_id) in scrape.LEAGUE_CONFIG.items():
+                if key != cache_key:
+                    continue
+                rows = scrape.find_section(sections, section_id)
+                if not rows or rows == self.stored[league]:
+                    continue
+                if positions(rows) != positions(self.stored[league]):
+                    moved.append(league)
+                updated[league] = rows
+
+        # The rebuild imports the JSON files, so write them first
+        previous = {league: self.stored[league] for league in updated}
+        for league, rows in updated.items():
+            self.store(league, rows)
+            print(f"Updated tables/{self.year}/{league}.json")
+
+        if moved:
+            self.last_change = self.clock.now()
+            print(f"Positions moved in {', '.join(moved)}: rebuilding")
+            try:
+                await asyncio.to_thread(self.on_change, moved)
+            except Exception:
+                for league, rows in previous.items():
+                    self.store(league, rows)
+                print(f"Rebuild failed; restored {', '.join(previous)} for the next poll")
+                raise
+        self.last_html.update(fetched)
+        return moved
+
+    async def run(self, max_polls=None):
+        """Poll forever (or max_polls times) on the adaptive schedule."""
+        polls = 0
+        while max_polls is None or polls < max_polls:
+            try:
+                await self.poll()
+            except Exception as e:  # keep the daemon alive; the next poll retries
+                print(f"Error during poll: {e}")
+            polls += 1
+            if max_polls is not None and polls >= max_polls:
+                break
+            interval = next_interval(self.clock.now(), self.last_change)
+            print(f"{self.clock.now():%Y-%m-%d %H:%M} JST: next poll in {int(interval)}s")
+            await self.clock.sleep(interval)
+
+
+@click.command()
+@click.option('--year', default=None, help='Season year (e.g. 2026). Auto-detects latest from tables/ if omitted.')
+@click.option('--image/--no-image', default=False, help='Also render docs/leaderboard.png on rebuild.')
+@click.option('--jobs', '-j', default=1, show_default=True, help='Worker processes for rendering user pages.')
+@click.option('--once', is_flag=True, help='Poll once and exit (e.g. from cron).')
+@click.option('--base-url', default=None, help=f'Fetch from this server instead of {JLEAGUE_ROOT}.')
+def main(year, image, jobs, once, base_url):
+    """Watch the J.League standings and rebuild the site when positions move."""
+    year = year or build.detect_year() or str(scrape.current_year)
+    print(f"Watching {year} standings")
+    watcher = Watcher(year, base_url=base_url, image=image, jobs=jobs)
+    try:
+        asyncio.run(watcher.run(max_polls=1 if once else None))
+    except KeyboardInterrupt:
+        print("\nStopped.")
+
+
+if __name__ == '__main__':
+    main()